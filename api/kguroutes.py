@@ -1,7 +1,8 @@
+import json
 import logging
 import os
 import threading
-from flask import Blueprint, request
+from flask import Blueprint, Response, request, stream_with_context
 
 from definitions import ROOT_DIR, LOGGER_CONFIG_PATH
 from knowledgegraphupdater.kgupdater import KnowledgeGraphUpdater
@@ -16,6 +17,46 @@ logging.config.fileConfig(LOGGER_CONFIG_PATH,
 logger = logging.getLogger()
 
 updating = False  # flag for update_missed_knowledge operation
+NDJSON_MIMETYPE = 'application/x-ndjson'
+
+
+def get_page_args():
+    """
+    Returns the cursor and the limit of the requested page, from the 'cursor' and 'limit' query parameters.
+
+    :return: tuple of the cursor (or None for the first page) and the limit (or None for the default page size)
+    :rtype: tuple
+    :raises ValueError: if the limit is not an integer
+    """
+    limit = request.args.get('limit')
+    if limit is not None:
+        try:
+            limit = int(limit)
+        except ValueError:
+            raise ValueError('Limit must be an integer: ' + limit)
+    return request.args.get('cursor'), limit
+
+
+def wants_ndjson():
+    """
+    Returns whether the client prefers a newline-delimited JSON stream to a single JSON object.
+
+    :return: True if 'application/x-ndjson' is preferred to 'application/json' by the Accept header
+    :rtype: bool
+    """
+    return request.accept_mimetypes.best_match(['application/json', NDJSON_MIMETYPE]) == NDJSON_MIMETYPE
+
+
+def ndjson_response(items):
+    """
+    Returns a response that streams the items as newline-delimited JSON, one item per line, as they are generated.
+
+    :param items: items to be streamed
+    :type items: iterable
+    :return: streamed response
+    :rtype: flask.Response
+    """
+    return Response(stream_with_context(json.dumps(item) + '\n' for item in items), mimetype=NDJSON_MIMETYPE)
 
 
 @kgu_api.route('/updates/status/')
@@ -155,9 +196,16 @@ def insert_article_triples():
         description: Triples were inserted successfully.
         schema:
           id: standard_message
+      500:
+        description: Some triples could not be inserted to the knowledge graph.
     """
     data = request.get_json()
-    kgu.insert_articles_knowledge(data)
+    inserted = kgu.insert_articles_knowledge(data)
+    flat_triples = [{'source': article['source'], 'sentence': sentence['sentence'], **triple}
+                    for article in data for sentence in article['triples'] for triple in sentence['triples']]
+    if not all(inserted):
+        return {'message': 'Some triples could not be inserted to the knowledge graph.',
+                'failed': [triple for (triple, triple_inserted) in zip(flat_triples, inserted) if not triple_inserted]}, 500
     return {"message": "Triples inserted."}, 200
 
 
@@ -184,8 +232,13 @@ def delete_all_article_triples(source):
               type: string
             message:
               type: string
+      500:
+        description: Some triples of the article could not be deleted from the knowledge graph.
     """
-    kgu.delete_all_knowledge_from_article(source)
+    failed = kgu.delete_all_knowledge_from_article(source)
+    if len(failed) > 0:
+        return {'source': source, 'message': 'Some triples could not be deleted from the knowledge graph.',
+                'failed': failed}, 500
     return {'source': source, 'message': 'All triples deleted.'}, 200
 
 
@@ -340,10 +393,24 @@ def delete_pending_triples_from_articles():
 @kgu_api.route('/article-triples/pending/')
 def pending_triples_from_articles():
     """
-    Returns all pending triples from all scraped articles.
+    Returns a page of pending triples from all scraped articles.
+    With "Accept: application/x-ndjson", all pending triples from the cursor onwards are streamed instead,
+    one article per line, and the limit is ignored.
     ---
     tags:
       - Knowledge Graph Updater (Articles)
+    produces:
+      - application/json
+      - application/x-ndjson
+    parameters:
+      - name: cursor
+        in: query
+        description: cursor returned as next_cursor with the previous page, to retrieve the next page.
+        type: string
+      - name: limit
+        in: query
+        description: maximum number of articles in the page (default 100, at most 1000).
+        type: integer
     responses:
       200:
         description: Pending triples of all articles returned successfully
@@ -355,8 +422,21 @@ def pending_triples_from_articles():
               type: array
               items:
                 $ref: '#/definitions/article_triples'
+            next_cursor:
+              type: string
+              description: cursor of the next page, or null if it is the last page
+      400:
+        description: The cursor or the limit is invalid.
+        schema:
+          id: standard_message
     """
-    return {'all_pending': kgu.get_all_pending_knowledge()}, 200
+    try:
+        if wants_ndjson():
+            return ndjson_response(kgu.iterate_all_pending_knowledge(request.args.get('cursor')))
+        pending, next_cursor = kgu.get_all_pending_knowledge(*get_page_args())
+    except ValueError as e:
+        return {'message': str(e)}, 400
+    return {'all_pending': pending, 'next_cursor': next_cursor}, 200
 
 
 @kgu_api.route('/article-triples/<path:source>')
@@ -422,10 +502,24 @@ def triples_from_article(source):
 @kgu_api.route('/article-triples/')
 def triples_from_articles():
     """
-    Returns all triples from all extracted articles.
+    Returns a page of triples from all extracted articles.
+    With "Accept: application/x-ndjson", all triples from the cursor onwards are streamed instead,
+    one article per line, and the limit is ignored.
     ---
     tags:
       - Knowledge Graph Updater (Articles)
+    produces:
+      - application/json
+      - application/x-ndjson
+    parameters:
+      - name: cursor
+        in: query
+        description: cursor returned as next_cursor with the previous page, to retrieve the next page.
+        type: string
+      - name: limit
+        in: query
+        description: maximum number of articles in the page (default 100, at most 1000).
+        type: integer
     responses:
       200:
         description: Triples of all articles returned successfully
@@ -436,18 +530,44 @@ def triples_from_articles():
               type: array
               items:
                 $ref: '#/definitions/article_triples'
-        """
-    # TODO: add pagination
-    return {'all_triples': kgu.get_all_articles_knowledge()}, 200
+            next_cursor:
+              type: string
+              description: cursor of the next page, or null if it is the last page
+      400:
+        description: The cursor or the limit is invalid.
+        schema:
+          id: standard_message
+    """
+    try:
+        if wants_ndjson():
+            return ndjson_response(kgu.iterate_all_articles_knowledge(request.args.get('cursor')))
+        triples, next_cursor = kgu.get_all_articles_knowledge(*get_page_args())
+    except ValueError as e:
+        return {'message': str(e)}, 400
+    return {'all_triples': triples, 'next_cursor': next_cursor}, 200
 
 
 @kgu_api.route('/articles/extracted/')
 def all_extracted_article_urls():
     """
-    Returns all articles' URLs, headlines, and dates whose triples have been extracted.
+    Returns a page of all articles' URLs, headlines, and dates whose triples have been extracted.
+    With "Accept: application/x-ndjson", all articles from the cursor onwards are streamed instead,
+    one article per line, and the limit is ignored.
     ---
     tags:
       - Knowledge Graph Updater (Articles)
+    produces:
+      - application/json
+      - application/x-ndjson
+    parameters:
+      - name: cursor
+        in: query
+        description: cursor returned as next_cursor with the previous page, to retrieve the next page.
+        type: string
+      - name: limit
+        in: query
+        description: maximum number of articles in the page (default 100, at most 1000).
+        type: integer
     responses:
       200:
         description: Array of articles URLs, headlines, and dates
@@ -466,8 +586,21 @@ def all_extracted_article_urls():
                   date:
                     type: string
                     description: POSIX timestamp
+            next_cursor:
+              type: string
+              description: cursor of the next page, or null if it is the last page
+      400:
+        description: The cursor or the limit is invalid.
+        schema:
+          id: standard_message
     """
-    return {'articles': kgu.get_all_extracted_articles()}, 200
+    try:
+        if wants_ndjson():
+            return ndjson_response(kgu.iterate_all_extracted_articles(request.args.get('cursor')))
+        articles, next_cursor = kgu.get_all_extracted_articles(*get_page_args())
+    except ValueError as e:
+        return {'message': str(e)}, 400
+    return {'articles': articles, 'next_cursor': next_cursor}, 200
 
 
 @kgu_api.route('/articles/', methods=['POST'])
@@ -507,10 +640,24 @@ def new_article():
 @kgu_api.route('/articles/')
 def all_article_urls():
     """
-    Returns all articles' URLs, headlines, and dates
+    Returns a page of all articles' URLs, headlines, and dates
+    With "Accept: application/x-ndjson", all articles from the cursor onwards are streamed instead,
+    one article per line, and the limit is ignored.
     ---
     tags:
       - Knowledge Graph Updater (Articles)
+    produces:
+      - application/json
+      - application/x-ndjson
+    parameters:
+      - name: cursor
+        in: query
+        description: cursor returned as next_cursor with the previous page, to retrieve the next page.
+        type: string
+      - name: limit
+        in: query
+        description: maximum number of articles in the page (default 100, at most 1000).
+        type: integer
     responses:
       200:
         description: Array of articles URLs, headlines, and dates
@@ -529,8 +676,21 @@ def all_article_urls():
                   date:
                     type: string
                     description: POSIX timestamp
+            next_cursor:
+              type: string
+              description: cursor of the next page, or null if it is the last page
+      400:
+        description: The cursor or the limit is invalid.
+        schema:
+          id: standard_message
     """
-    return {'articles': kgu.get_all_articles()}, 200
+    try:
+        if wants_ndjson():
+            return ndjson_response(kgu.iterate_all_articles(request.args.get('cursor')))
+        articles, next_cursor = kgu.get_all_articles(*get_page_args())
+    except ValueError as e:
+        return {'message': str(e)}, 400
+    return {'articles': articles, 'next_cursor': next_cursor}, 200
 
 
 @kgu_api.route('/triples/force/', methods=['POST'])
@@ -567,11 +727,12 @@ def force_insert_triples():
           id: standard_message
     """
     data = request.get_json()
-    if type(data) is list:
-        for triple in data:
-            kgu.insert_knowledge(triple, check_conflict=False)
-    else:
-        kgu.insert_knowledge(data, check_conflict=False)
+    if type(data) is not list:
+        data = [data]
+    inserted = kgu.insert_knowledge_bulk(data)
+    if not all(inserted):
+        return {'message': 'Some triples could not be inserted to the knowledge graph.',
+                'failed': [triple for (triple, triple_inserted) in zip(data, inserted) if not triple_inserted]}, 500
     return {'message': 'All triples inserted.'}, 200
 
 
@@ -747,12 +908,16 @@ def delete_triples():
         description: Triples were deleted successfully.
         schema:
           id: standard_message
+      500:
+        description: Some triples could not be deleted from the knowledge graph.
     """
     data = request.get_json()
-    if type(data) is list:
-        kgu.delete_knowledge(data)
-    else:
-        kgu.delete_knowledge([data])
+    if type(data) is not list:
+        data = [data]
+    deleted = kgu.delete_knowledge(data)
+    if not all(deleted):
+        return {'message': 'Some triples could not be deleted from the knowledge graph.',
+                'failed': [triple for (triple, triple_deleted) in zip(data, deleted) if not triple_deleted]}, 500
     return {'message': 'Triples deleted.'}, 200
 
 
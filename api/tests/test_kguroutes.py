@@ -0,0 +1,95 @@
+import json
+import mongomock
+import unittest
+from datetime import datetime
+from flask import Flask
+from mock import patch
+
+with patch('knowledgegraphupdater.kgupdater.MongoClient', mongomock.MongoClient), \
+        patch('knowledgegraphupdater.kgupdater.TripleProducer'), \
+        patch('knowledgegraphupdater.kgupdater.KnowledgeGraphWrapper'), \
+        patch('knowledgegraphupdater.kgupdater.EntityCorefResolver'), \
+        patch('knowledgegraphupdater.kgupdater.Scrapers'):
+    from ..kguroutes import kgu, kgu_api
+
+
+class TestKguRoutes(unittest.TestCase):
+
+    def setUp(self):
+        kgu.db_article_collection.delete_many({})
+        kgu.db_article_triples_collection.delete_many({})
+        app = Flask(__name__)
+        app.register_blueprint(kgu_api, url_prefix='/kgu')
+        self.client = app.test_client()
+
+    def test_page_invalid_limit(self):
+        for path in ['/kgu/articles/', '/kgu/articles/extracted/', '/kgu/article-triples/',
+                     '/kgu/article-triples/pending/']:
+            response = self.client.get(path, query_string={'limit': 'abc'})
+
+            self.assertEqual(400, response.status_code)
+            self.assertIn('abc', response.get_json()['message'])
+
+    def test_page_invalid_cursor(self):
+        response = self.client.get('/kgu/articles/extracted/', query_string={'cursor': 'abc'})
+
+        self.assertEqual(400, response.status_code)
+
+    def test_empty_pending_page_is_last(self):
+        kgu.db_article_collection.insert_many([{'source': 'a', 'extracted': True}, {'source': 'b', 'extracted': True}])
+
+        response = self.client.get('/kgu/article-triples/pending/', query_string={'limit': 1})
+
+        self.assertEqual(200, response.status_code)
+        self.assertEqual({'all_pending': [], 'next_cursor': None}, response.get_json())
+
+    def get_ndjson(self, path, **query_string):
+        response = self.client.get(path, query_string=query_string, headers={'Accept': 'application/x-ndjson'})
+        return response, [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+
+    def test_articles_streamed_as_ndjson(self):
+        sources = ['https://www.bbc.co.uk/news/' + str(i) for i in range(5)]
+        kgu.db_article_collection.insert_many([{'source': source, 'headlines': ['Headline'],
+                                                'date': datetime(2021, 1, 1), 'extracted': True}
+                                               for source in sources])
+
+        # the articles are read in pages of 2
+        with patch.object(kgu, 'MAX_PAGE_SIZE', 2):
+            response, articles = self.get_ndjson('/kgu/articles/', limit=1)
+            _, extracted = self.get_ndjson('/kgu/articles/extracted/')
+            cursor = self.client.get('/kgu/articles/', query_string={'limit': 2}).get_json()['next_cursor']
+            _, remaining = self.get_ndjson('/kgu/articles/', cursor=cursor)
+
+        self.assertEqual(200, response.status_code)
+        self.assertEqual('application/x-ndjson', response.mimetype)
+        # one article per line, regardless of the limit
+        self.assertEqual(sources, [article['source'] for article in articles])
+        self.assertEqual(sources, [article['source'] for article in extracted])
+        self.assertEqual(sources[2:], [article['source'] for article in remaining])
+
+    def test_pending_triples_streamed_as_ndjson(self):
+        sources = ['https://www.bbc.co.uk/news/' + str(i) for i in range(5)]
+        kgu.db_article_triples_collection.insert_many([
+            {'source': source, 'sentence_index': 0, 'sentence': 'John Doe ignored it.', 'triple_key': source,
+             'subject': 'John_Doe', 'relation': 'ignore', 'objects': ['Social_distancing'], 'added': False}
+            for source in sources])
+
+        with patch.object(kgu, 'MAX_PAGE_SIZE', 2):
+            _, pending = self.get_ndjson('/kgu/article-triples/pending/')
+
+        self.assertEqual(sources, [article['source'] for article in pending])
+        self.assertEqual([[{'sentence': 'John Doe ignored it.', 'triples': [
+            {'subject': 'John_Doe', 'relation': 'ignore', 'objects': ['Social_distancing'], 'added': False}]}]] * 5,
+            [article['triples'] for article in pending])
+
+    def test_ndjson_invalid_cursor(self):
+        for path in ['/kgu/articles/', '/kgu/articles/extracted/', '/kgu/article-triples/']:
+            response = self.client.get(path, query_string={'cursor': 'abc'},
+                                       headers={'Accept': 'application/x-ndjson'})
+
+            self.assertEqual(400, response.status_code)
+            self.assertEqual('application/json', response.mimetype)
+
+
+if __name__ == '__main__':
+    unittest.main()
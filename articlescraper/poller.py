@@ -2,22 +2,30 @@ import feedparser
 import logging
 import os
 import schedule
+import threading
 import time
 
+from concurrent.futures import ThreadPoolExecutor
 from dotenv import load_dotenv
 from pathlib import Path
 from pymongo import MongoClient
+from urllib.parse import urlparse
 
 from articlescraper.scrapers import IndependentScraper, BbcScraper, GuardianScraper
+from common.cache import LRUCache
 
 
 class NewsPoller:
     """
     NewsPoller polls the RSS endpoints periodically (currently every minute) and uses scrapers to scrape articles.
+    The feeds are polled concurrently, and new articles are scraped by a pool of threads per host, which limits the
+    number of concurrent requests to each host, so that a slow website does not delay the others.
     """
     BBC_RSS_URL = "http://feeds.bbci.co.uk/news/rss.xml"
     INDEPENDENT_RSS_URL = "https://www.independent.co.uk/news/rss"
     GUARDIAN_RSS_URL = "https://www.theguardian.com/uk/rss"
+    HOST_CONCURRENCY = 2  # maximum number of articles of the same host scraped concurrently
+    SEEN_URLS_SIZE = 10000  # number of recently seen article URLs that are known to be in the DB
     logger = logging.getLogger()
 
     def __init__(self):
@@ -29,33 +37,71 @@ class NewsPoller:
         self.db = self.db_client["fnd"] # TODO: parameterised
         self.db_collection = self.db["articles"] # TODO: parameterised
         self.db_collection.create_index("source", unique=True)
+        self.__lock = threading.Lock()
+        self.__polling = set()  # RSS URLs of the feeds that are being polled
+        self.__scraping = set()  # URLs of the articles that are queued or being scraped
+        self.__host_executors = {}  # thread pools that scrape the articles of each host
+        self.__feed_validators = {}  # ETag and Last-Modified of the last response of each feed
+        self.seen_urls = LRUCache(NewsPoller.SEEN_URLS_SIZE)
         NewsPoller.logger.info('NewsPoller initialised.')
 
     def start(self):
         """
         Starts the periodical polling process. Currently set to every minute.
+        Every feed is polled in its own thread, and a feed is not polled again while its previous poll is running.
         """
         NewsPoller.logger.info('NewsPoller started.')
 
-        bbc = BbcScraper()
-        self.poll_news_feed(NewsPoller.BBC_RSS_URL, bbc)
-        schedule.every().minute.do(self.poll_news_feed, NewsPoller.BBC_RSS_URL, bbc)
-
-        independent = IndependentScraper()
-        self.poll_news_feed(NewsPoller.INDEPENDENT_RSS_URL, independent)
-        schedule.every().minute.do(self.poll_news_feed, NewsPoller.INDEPENDENT_RSS_URL, independent)
-
-        guardian = GuardianScraper()
-        self.poll_news_feed(NewsPoller.GUARDIAN_RSS_URL, guardian)
-        schedule.every().minute.do(self.poll_news_feed, NewsPoller.GUARDIAN_RSS_URL, guardian)
+        feeds = [(NewsPoller.BBC_RSS_URL, BbcScraper()),
+                 (NewsPoller.INDEPENDENT_RSS_URL, IndependentScraper()),
+                 (NewsPoller.GUARDIAN_RSS_URL, GuardianScraper())]
+        for rss_url, scraper in feeds:
+            self.__start_polling(rss_url, scraper)
+            schedule.every().minute.do(self.__start_polling, rss_url, scraper)
 
         while True:
             schedule.run_pending()
             time.sleep(1)
 
+    def __start_polling(self, rss_url, scraper):
+        """
+        Private method that polls the news feed in a new thread, unless the feed is still being polled.
+
+        :param rss_url: News feed RSS URL
+        :type rss_url: str
+        :param scraper: Scraper for the corresponding news website
+        :type scraper: articlescraper.ArticleScraper
+        """
+        with self.__lock:
+            if rss_url in self.__polling:
+                NewsPoller.logger.info('%s is still being polled, skipping this poll', rss_url)
+                return
+            self.__polling.add(rss_url)
+        threading.Thread(target=self.__poll, args=(rss_url, scraper), daemon=True).start()
+
+    def __poll(self, rss_url, scraper):
+        """
+        Private method that polls the news feed, and marks it as not being polled afterwards.
+
+        :param rss_url: News feed RSS URL
+        :type rss_url: str
+        :param scraper: Scraper for the corresponding news website
+        :type scraper: articlescraper.ArticleScraper
+        """
+        try:
+            self.poll_news_feed(rss_url, scraper)
+        except Exception:
+            NewsPoller.logger.exception('Exception occured when polling %s', rss_url)
+        finally:
+            with self.__lock:
+                self.__polling.discard(rss_url)
+
     def poll_news_feed(self, rss_url, scraper):
         """
-        Polls the news feed RSS and uses the scraper to scrape articles.
+        Polls the news feed RSS and queues the new articles to be scraped by the scraper.
+        The ETag and Last-Modified of the previous response are sent with the request, so that an unchanged feed is
+        not downloaded and parsed again. The articles recently seen in the DB are skipped, and the other articles are
+        looked up in the DB with a single query.
 
         :param rss_url: News feed RSS URL
         :type rss_url: str
@@ -63,8 +109,58 @@ class NewsPoller:
         :type scraper: articlescraper.ArticleScraper
         """
         NewsPoller.logger.info('Polling %s ...', rss_url)
-        entries = feedparser.parse(rss_url)['entries']
-        for entry in entries:
-            if self.db_collection.find_one({"source": entry['link']}) is None:
-                NewsPoller.logger.info('Scraping %s %s...', entry['link'], entry['published'])
-                scraper.execute(entry['link'])
+        validators = self.__feed_validators.get(rss_url, {})
+        feed = feedparser.parse(rss_url, etag=validators.get('etag'), modified=validators.get('modified'))
+        if feed.get('status') == 304:
+            NewsPoller.logger.info('%s has not been modified', rss_url)
+            return
+        self.__feed_validators[rss_url] = {'etag': feed.get('etag'), 'modified': feed.get('modified')}
+        entries = {entry['link']: entry for entry in feed['entries'] if entry['link'] not in self.seen_urls}
+        if len(entries) == 0:
+            return
+        for article in self.db_collection.find({"source": {"$in": list(entries)}}, {"_id": 0, "source": 1}):
+            self.seen_urls.set(article['source'], True)
+            del entries[article['source']]
+        for link, entry in entries.items():
+            self.__queue_scrape(link, entry.get('published'), scraper)
+
+    def __queue_scrape(self, url, published, scraper):
+        """
+        Private method that queues the article to be scraped, unless it is already queued or being scraped.
+
+        :param url: Article url
+        :type url: str
+        :param published: publication date of the article in the feed
+        :type published: str
+        :param scraper: Scraper for the corresponding news website
+        :type scraper: articlescraper.ArticleScraper
+        """
+        with self.__lock:
+            if url in self.__scraping:
+                return
+            self.__scraping.add(url)
+            host = urlparse(url).netloc
+            executor = self.__host_executors.get(host)
+            if executor is None:
+                executor = ThreadPoolExecutor(max_workers=NewsPoller.HOST_CONCURRENCY)
+                self.__host_executors[host] = executor
+        NewsPoller.logger.info('Queueing %s %s to be scraped...', url, published)
+        executor.submit(self.__scrape, url, scraper)
+
+    def __scrape(self, url, scraper):
+        """
+        Private method that scrapes the article, and marks it as not being scraped afterwards.
+
+        :param url: Article url
+        :type url: str
+        :param scraper: Scraper for the corresponding news website
+        :type scraper: articlescraper.ArticleScraper
+        """
+        try:
+            NewsPoller.logger.info('Scraping %s...', url)
+            scraper.execute(url)
+        except Exception:
+            NewsPoller.logger.exception('Exception occured when scraping %s', url)
+        finally:
+            with self.__lock:
+                self.__scraping.discard(url)
@@ -59,7 +59,9 @@ class ArticleScraper(ABC):
         :type article: dict
         """
         try:
-            self.db_collection.update_one({'source': article['source']}, {'$set': article}, upsert=True)
+            # new articles are pending extraction by the Knowledge Graph Updater
+            self.db_collection.update_one({'source': article['source']},
+                                          {'$set': article, '$setOnInsert': {'extracted': False}}, upsert=True)
         except Exception as e:
             ArticleScraper.logger.exception('Exception occured when saving to DB')
 
@@ -0,0 +1,101 @@
+import mongomock
+import threading
+import time
+import unittest
+from mock import MagicMock, patch
+
+from ..poller import NewsPoller
+
+
+class TestNewsPoller(unittest.TestCase):
+
+    rss_url = 'https://www.theguardian.com/uk/rss'
+
+    def setUp(self):
+        mongomock.MongoClient().drop_database('fnd')
+        patcher = patch('articlescraper.poller.MongoClient', mongomock.MongoClient)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.poller = NewsPoller()
+
+    @staticmethod
+    def feed(links, etag=None, modified=None):
+        return {'status': 200, 'etag': etag, 'modified': modified,
+                'entries': [{'link': link, 'published': 'Sat, 17 Oct 2020 10:00:00 GMT'} for link in links]}
+
+    @staticmethod
+    def wait_for(condition, timeout=5):
+        deadline = time.monotonic() + timeout
+        while not condition() and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+    @patch('articlescraper.poller.feedparser.parse')
+    def test_validators_sent_on_next_poll(self, mock_parse):
+        mock_parse.side_effect = [self.feed([], etag='"v1"', modified='Sat, 17 Oct 2020 10:00:00 GMT'),
+                                  {'status': 304}]
+        scraper = MagicMock()
+
+        with patch.object(self.poller.db_collection, 'find', wraps=self.poller.db_collection.find) as find:
+            self.poller.poll_news_feed(self.rss_url, scraper)
+            self.poller.poll_news_feed(self.rss_url, scraper)
+
+            # the unchanged feed is neither looked up nor scraped
+            find.assert_not_called()
+        mock_parse.assert_any_call(self.rss_url, etag=None, modified=None)
+        mock_parse.assert_called_with(self.rss_url, etag='"v1"', modified='Sat, 17 Oct 2020 10:00:00 GMT')
+        scraper.execute.assert_not_called()
+
+    @patch('articlescraper.poller.feedparser.parse')
+    def test_seen_urls_not_queried_again(self, mock_parse):
+        links = ['https://www.theguardian.com/a', 'https://www.theguardian.com/b', 'https://www.theguardian.com/c']
+        mock_parse.return_value = self.feed(links)
+        self.poller.db_collection.insert_one({'source': links[0]})
+        scraper = MagicMock()
+        scraper.execute.side_effect = lambda url: self.poller.db_collection.insert_one({'source': url})
+
+        with patch.object(self.poller.db_collection, 'find', wraps=self.poller.db_collection.find) as find:
+            self.poller.poll_news_feed(self.rss_url, scraper)
+            self.wait_for(lambda: self.poller.db_collection.count_documents({}) == len(links))
+            # the scraped articles are found in the DB, and the article of the first poll is already known
+            self.poller.poll_news_feed(self.rss_url, scraper)
+            # every article is known
+            self.poller.poll_news_feed(self.rss_url, scraper)
+
+            self.assertEqual([{'source': {'$in': links}}, {'source': {'$in': links[1:]}}],
+                             [call[0][0] for call in find.call_args_list])
+        self.assertEqual(sorted(links[1:]), sorted(call[0][0] for call in scraper.execute.call_args_list))
+
+    @patch('articlescraper.poller.feedparser.parse')
+    def test_host_concurrency(self, mock_parse):
+        links = ['https://www.theguardian.com/' + str(i) for i in range(5)] + ['https://www.bbc.co.uk/news/1']
+        mock_parse.return_value = self.feed(links)
+        release = threading.Event()
+        lock = threading.Lock()
+        running = {}
+        max_running = {}
+
+        def execute(url):
+            host = url.split('/')[2]
+            with lock:
+                running[host] = running.get(host, 0) + 1
+                max_running[host] = max(max_running.get(host, 0), running[host])
+            if host == 'www.theguardian.com':
+                release.wait(5)
+            with lock:
+                running[host] -= 1
+        scraper = MagicMock()
+        scraper.execute.side_effect = execute
+
+        self.poller.poll_news_feed(self.rss_url, scraper)
+        # the other host is not delayed by the blocked one
+        self.wait_for(lambda: max_running.get('www.bbc.co.uk') == 1)
+        self.assertEqual(1, max_running.get('www.bbc.co.uk'))
+        release.set()
+        self.wait_for(lambda: scraper.execute.call_count == len(links) and sum(running.values()) == 0)
+
+        self.assertEqual(len(links), scraper.execute.call_count)
+        self.assertEqual(NewsPoller.HOST_CONCURRENCY, max_running['www.theguardian.com'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,133 @@
+import threading
+import time
+
+from collections import OrderedDict
+
+
+class LRUCache:
+    """
+    A thread-safe, size-bounded cache that evicts the least recently used entry once it is full.
+    Entries can optionally expire after a time-to-live. Hits, misses, and evictions are counted.
+    Every invalidation increments the generation of the cache, so that a value computed before an invalidation is not
+    cached after it.
+
+    :param maxsize: maximum number of entries in the cache
+    :type maxsize: int
+    :param ttl: time-to-live of an entry in seconds, or None if entries never expire
+    :type ttl: float
+    """
+    MISSING = object()  # returned by get() if the key is not cached, because None can be a cached value
+
+    def __init__(self, maxsize, ttl=None):
+        """
+        Constructor method
+        """
+        if maxsize < 1:
+            raise ValueError("The maxsize of the cache must be at least 1.")
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.generation = 0  # number of invalidations, see set()
+        self.__entries = OrderedDict()
+        self.__lock = threading.Lock()
+
+    def __len__(self):
+        with self.__lock:
+            return len(self.__entries)
+
+    def __contains__(self, key):
+        return self.get(key, count=False) is not LRUCache.MISSING
+
+    def get(self, key, count=True):
+        """
+        Returns the cached value of the key and marks it as the most recently used entry.
+
+        :param key: key of the entry
+        :type key: hashable
+        :param count: whether the lookup is counted as a hit or miss
+        :type count: bool
+        :return: the cached value, or LRUCache.MISSING if the key is not cached or has expired
+        :rtype: object
+        """
+        with self.__lock:
+            entry = self.__entries.get(key)
+            if entry is not None and self.ttl is not None and entry[1] < time.monotonic():
+                del self.__entries[key]
+                entry = None
+            if entry is None:
+                if count:
+                    self.misses += 1
+                return LRUCache.MISSING
+            self.__entries.move_to_end(key)
+            if count:
+                self.hits += 1
+            return entry[0]
+
+    def set(self, key, value, generation=None):
+        """
+        Caches the value of the key, evicting the least recently used entry if the cache is full.
+
+        :param key: key of the entry
+        :type key: hashable
+        :param value: value to be cached
+        :type value: object
+        :param generation: generation of the cache read before the value was computed. The value is not cached if the
+            cache has been invalidated since, because the value may be stale.
+        :type generation: int
+        :return: whether the value has been cached
+        :rtype: bool
+        """
+        expiry = time.monotonic() + self.ttl if self.ttl is not None else None
+        with self.__lock:
+            if generation is not None and generation != self.generation:
+                return False
+            self.__entries[key] = (value, expiry)
+            self.__entries.move_to_end(key)
+            while len(self.__entries) > self.maxsize:
+                self.__entries.popitem(last=False)
+                self.evictions += 1
+            return True
+
+    def invalidate(self, key):
+        """
+        Removes the entry of the key from the cache, if it exists.
+
+        :param key: key of the entry
+        :type key: hashable
+        """
+        with self.__lock:
+            self.generation += 1
+            self.__entries.pop(key, None)
+
+    def invalidate_where(self, predicate):
+        """
+        Removes all entries whose key satisfies the predicate.
+
+        :param predicate: function that takes a key and returns True if the entry should be removed
+        :type predicate: function
+        """
+        with self.__lock:
+            self.generation += 1
+            for key in [key for key in self.__entries if predicate(key)]:
+                del self.__entries[key]
+
+    def clear(self):
+        """
+        Removes all entries from the cache.
+        """
+        with self.__lock:
+            self.generation += 1
+            self.__entries.clear()
+
+    def stats(self):
+        """
+        Returns the statistics of the cache.
+
+        :return: dictionary of the number of entries, hits, misses, and evictions
+        :rtype: dict
+        """
+        with self.__lock:
+            return {'size': len(self.__entries), 'maxsize': self.maxsize, 'hits': self.hits, 'misses': self.misses,
+                    'evictions': self.evictions}
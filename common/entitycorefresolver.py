@@ -1,6 +1,4 @@
-import neuralcoref
-import spacy
-
+from .models import get_nlp
 from .utils import convert_to_dbpedia_resource
 
 
@@ -16,9 +14,12 @@ class EntityCorefResolver:
                  'they', 'them', 'their', 'theirs',
                  'it', 'its']
 
-    def __init__(self):
-        self.nlp = spacy.load('en')
-        neuralcoref.add_to_pipe(self.nlp)
+    @property
+    def nlp(self):
+        """
+        The spaCy pipeline (with neuralcoref), shared across the process and loaded on its first use.
+        """
+        return get_nlp()
 
     def get_coref_clusters(self, doc):
         """
@@ -27,12 +28,12 @@ class EntityCorefResolver:
         and each value is a set of the other mentions for the cluster
         Standard pronouns (listed in BLACKLIST) are excluded.
 
-        :param doc: a text
-        :type doc: str
+        :param doc: a text, or a spacy document that has been parsed with neuralcoref
+        :type doc: str or spacy.tokens.Doc
         :return: dictionary of coreference clusters, as described above
         :rtype: dict
         """
-        spacy_doc = self.nlp(doc)
+        spacy_doc = self.nlp(doc) if isinstance(doc, str) else doc
         coref_clusters = {convert_to_dbpedia_resource(cluster.main.text): {convert_to_dbpedia_resource(mention.text)
                                                                            for mention in cluster.mentions
                                                                            if mention.text.lower() not in self.BLACKLIST
@@ -1,11 +1,13 @@
 import logging
 import os
+import threading
 import urllib.parse
 
 from dotenv import load_dotenv
 from pathlib import Path
-from SPARQLWrapper import SPARQLWrapper, JSON, POST
 
+from .cache import LRUCache
+from .sparqlpool import SPARQLConnectionPool
 from .triple import Triple
 from .utils import convert_to_dbpedia_resource, DBPEDIA_RESOURCE, DBPEDIA_ONTOLOGY
 
@@ -14,18 +16,192 @@ class KnowledgeGraphWrapper:
     """
     A wrapper for RDF Triple Store (Knowledge Graph) operations.
     """
-    def __init__(self):
+    BULK_QUERY_SIZE = 100  # maximum number of rows in the VALUES block of a single bulk query
+    MAX_STATEMENT_SIZE = 50000  # maximum number of characters of the statements in a single bulk update
+
+    __caches = {}
+    __caches_lock = threading.Lock()
+
+    def __init__(self, pool_size=None, cache_size=None, cache_ttl=None):
         """
         Constructor method
+
+        :param pool_size: maximum number of connections to the SPARQL endpoint, defaults to the SPARQL_POOL_SIZE
+            environment variable. The connection pool is shared by all wrappers of the same endpoint, so this only
+            applies if this is the first wrapper created in the process.
+        :type pool_size: int
+        :param cache_size: maximum number of cached read query results, defaults to the SPARQL_CACHE_SIZE environment
+            variable. The cache is disabled if it is not set or 0, which is the default. Like the connection pool, the
+            cache is shared by all wrappers of the same endpoint, so that writes through one wrapper invalidate the
+            results cached by another. It is only shared within a process: writes made by other processes (e.g. the
+            updater and its workers, for the REST API) do not invalidate it, so its results can be stale for up to
+            cache_ttl seconds. Only enable it where that is acceptable.
+        :type cache_size: int
+        :param cache_ttl: time-to-live of the cached results in seconds, defaults to the SPARQL_CACHE_TTL environment
+            variable. Cached results never expire if it is not set.
+        :type cache_ttl: float
         """
         load_dotenv(dotenv_path=Path('../.env'))
-        self.sparql = SPARQLWrapper(os.getenv("SPARQL_ENDPOINT"))
+        endpoint = os.getenv("SPARQL_ENDPOINT")
+        if pool_size is None and os.getenv("SPARQL_POOL_SIZE"):
+            pool_size = int(os.getenv("SPARQL_POOL_SIZE"))
+        if cache_size is None and os.getenv("SPARQL_CACHE_SIZE"):
+            cache_size = int(os.getenv("SPARQL_CACHE_SIZE"))
+        if cache_ttl is None and os.getenv("SPARQL_CACHE_TTL"):
+            cache_ttl = float(os.getenv("SPARQL_CACHE_TTL"))
+        self.sparql = SPARQLConnectionPool.get_pool(endpoint, pool_size=pool_size)
+        self.cache = self.__get_cache(endpoint, cache_size, cache_ttl) if cache_size else None
         self.logger = logging.getLogger()
 
+    @classmethod
+    def __get_cache(cls, endpoint, cache_size, cache_ttl):
+        """
+        Returns the read query cache of the endpoint, which is created on the first call.
+
+        :param endpoint: URL of the SPARQL endpoint
+        :type endpoint: str
+        :param cache_size: maximum number of cached results, only used when the cache is created
+        :type cache_size: int
+        :param cache_ttl: time-to-live of the cached results in seconds, only used when the cache is created
+        :type cache_ttl: float
+        :return: the cache of the endpoint
+        :rtype: cache.LRUCache
+        """
+        with cls.__caches_lock:
+            if endpoint not in cls.__caches:
+                cls.__caches[endpoint] = LRUCache(cache_size, cache_ttl)
+            return cls.__caches[endpoint]
+
+    def __cached(self, key, query_function):
+        """
+        Returns the cached result of the key, or runs the query function and caches its result if the key is not
+        cached yet. The query function is always run if the cache is disabled.
+
+        :param key: cache key of the read query
+        :type key: tuple
+        :param query_function: function that runs the read query and returns its result
+        :type query_function: function
+        :return: result of the read query
+        :rtype: object
+        """
+        if self.cache is None:
+            return query_function()
+        generation = self.cache.generation
+        result = self.cache.get(key)
+        if result is LRUCache.MISSING:
+            result = query_function()
+            # not cached if a write has invalidated the cache while the query was running
+            self.cache.set(key, result, generation)
+        return result
+
+    def __invalidate_triple(self, subject, relation, obj):
+        """
+        Removes the cached results that may be affected by inserting or deleting a triple.
+
+        :param subject: triple's Subject
+        :type subject: str
+        :param relation: triple's Relation
+        :type relation: str
+        :param obj: triple's Object
+        :type obj: str
+        """
+        self.__invalidate_triples([(subject, relation, obj)])
+
+    def __invalidate_triples(self, triples):
+        """
+        Removes the cached results that may be affected by inserting or deleting triples, with a single scan of the
+        cache for all of them.
+        Transitive results of a relation are removed regardless of their Subject, because the Subject can be in the
+        sameAs relation with other entities.
+
+        :param triples: list of (Subject, Relation, Object) tuples
+        :type triples: list
+        """
+        if self.cache is None or len(triples) == 0:
+            return
+        pairs = {(subject, relation.rsplit('/')[-1]) for subject, relation, _ in triples}
+        relations = {relation for _, relation in pairs}
+        self.cache.invalidate_where(lambda key: key[0] == 'triples' and key[2] in relations
+                                    and (key[3] or (key[1], key[2]) in pairs))
+        for subject, _, obj in triples:
+            self.cache.invalidate(('resource', subject))
+            self.cache.invalidate(('resource', obj))
+
+    def __invalidate_same_entities(self, entity_a, entity_b):
+        """
+        Removes the cached results that may be affected by adding or removing a sameAs relation between two entities.
+
+        :param entity_a: a DBpedia resource/entity
+        :type entity_a: str
+        :param entity_b: a DBpedia resource/entity
+        :type entity_b: str
+        """
+        if self.cache is None:
+            return
+        self.cache.invalidate_where(lambda key: key[0] == 'triples' and key[3])
+        for entity in [entity_a, entity_b]:
+            self.cache.invalidate(('same', entity))
+            self.cache.invalidate(('resource', entity))
+
     def check_resource_existence(self, resource):
         """
         Checks if a resource exists in the Knowledge Graph, either as a Subject or Object.
 
+        :param resource: resource name in DBpedia format (must be prepended by "http://dbpedia.org/resource/")
+        :type resource: str
+        :return: True if resource exists, False otherwise
+        :rtype: bool
+        """
+        return self.__cached(('resource', resource), lambda: self.__query_resource_existence(resource))
+
+    def check_resources_existence_bulk(self, resources):
+        """
+        Checks which resources exist in the Knowledge Graph, either as a Subject or Object.
+        Cached results (both positive and negative) are reused, and the rest of the resources are sent as a VALUES block,
+        so they are checked with one SELECT query per BULK_QUERY_SIZE resources instead of one ASK query per resource.
+
+        :param resources: list of resource names in DBpedia format (must be prepended by "http://dbpedia.org/resource/")
+        :type resources: list
+        :return: set of the resources that exist
+        :rtype: set
+        """
+        existing = set()
+        unknown = []
+        for resource in dict.fromkeys(resources):
+            cached = self.cache.get(('resource', resource)) if self.cache is not None else LRUCache.MISSING
+            if cached is LRUCache.MISSING:
+                unknown.append(resource)
+            elif cached:
+                existing.add(resource)
+
+        for start in range(0, len(unknown), self.BULK_QUERY_SIZE):
+            chunk = unknown[start:start + self.BULK_QUERY_SIZE]
+            query = """
+                    PREFIX : <http://dbpedia.org/resource/>
+                    SELECT DISTINCT ?r WHERE {{
+                      VALUES ?r {{ {0} }}
+                      {{ ?r ?p ?o . }}
+                      UNION
+                      {{ ?s ?p ?r . }}
+                    }}
+                    """.format(' '.join(self.__format_subject(resource) for resource in chunk))
+            self.logger.info("Checking existence of %d resources in bulk", len(chunk))
+            generation = self.cache.generation if self.cache is not None else None
+            results = self.sparql.query(query)
+            if results.status_code != 200:
+                raise Exception("Check resources existence failed with status code " + str(results.status_code))
+            found = {res["r"]["value"] for res in results.json()["results"]["bindings"]}
+            for resource in chunk:
+                if self.cache is not None:
+                    self.cache.set(('resource', resource), resource in found, generation)
+                if resource in found:
+                    existing.add(resource)
+        return existing
+
+    def __query_resource_existence(self, resource):
+        """
+        Queries the Knowledge Graph whether a resource exists, either as a Subject or Object.
+
         :param resource: resource name in DBpedia format (must be prepended by "http://dbpedia.org/resource/")
         :type resource: str
         :return: True if resource exists, False otherwise
@@ -39,13 +215,11 @@ class KnowledgeGraphWrapper:
                   {{ ?s ?p <{0}> . }}
                 }}
                 """.format(resource)
-        self.sparql.setQuery(query)
-        self.sparql.setReturnFormat(JSON)
         self.logger.info("Checking resource existence: %s", resource)
-        results = self.sparql.query()
-        if results.response.status != 200:
-            raise Exception("Check resource existence failed with status code " + results.responses.status)
-        return results.convert()["boolean"]
+        results = self.sparql.query(query)
+        if results.status_code != 200:
+            raise Exception("Check resource existence failed with status code " + str(results.status_code))
+        return results.json()["boolean"]
 
     def check_triple_object_existence(self, triple, transitive=False):
         """
@@ -61,6 +235,48 @@ class KnowledgeGraphWrapper:
         exists = [self.check_triple_existence(triple.subject, triple.relation, obj, transitive) for obj in triple.objects]
         return all(exists)
 
+    def check_triples_existence_bulk(self, triples, transitive=False):
+        """
+        Checks if triples exist or not in the Knowledge Graph, using as few queries as possible.
+        Every (Subject, Relation, Object) combination is sent as a row of a VALUES block, so a list of triples is
+        checked with one SELECT query per BULK_QUERY_SIZE rows instead of one ASK query per Object.
+
+        :param triples: list of triples of type triple.Triple
+        :type triples: list
+        :param transitive: whether a check should also be done for entities that are in the sameAs Relation with the Subject
+        :type transitive: bool
+        :return: list of booleans in the same order as the triples, True if all Objects of the triple exist
+        :rtype: list
+        """
+        rows = [(i, triple.subject, triple.relation, obj) for i, triple in enumerate(triples) for obj in triple.objects]
+        found = set()
+        for start in range(0, len(rows), self.BULK_QUERY_SIZE):
+            chunk = rows[start:start + self.BULK_QUERY_SIZE]
+            values = '\n'.join('({0} {1} {2} {3})'.format(row_id, self.__format_subject(subject),
+                                                           self.__format_relation(relation), self.__format_object(obj))
+                               for row_id, (_, subject, relation, obj) in enumerate(chunk))
+            query = """
+                    PREFIX : <http://dbpedia.org/resource/>
+                    SELECT DISTINCT ?row WHERE {{
+                      VALUES (?row ?s ?p ?o) {{
+                        {0}
+                      }}
+                      ?s ?p ?o .
+                    }}
+                    """.format(values)
+            if transitive:
+                query = "DEFINE input:same-as \"yes\"" + query
+            self.logger.info("Checking existence of %d triple objects in bulk", len(chunk))
+            results = self.sparql.query(query)
+            if results.status_code != 200:
+                raise Exception("Check triples existence failed with status code " + str(results.status_code))
+            found.update(start + int(res["row"]["value"]) for res in results.json()["results"]["bindings"])
+        exists = [True] * len(triples)
+        for row, (i, _, _, _) in enumerate(rows):
+            if row not in found:
+                exists[i] = False
+        return exists
+
     def check_triple_object_opposite_relation_existence(self, triple, transitive=False):
         """
         Checks if a triple with the opposite relation (Objects-Relation-Subject) exists or not in the Knowledge Graph.
@@ -113,18 +329,71 @@ class KnowledgeGraphWrapper:
                 """.format(subject, relation_query, obj_query)
         if transitive:
             query = "DEFINE input:same-as \"yes\"" + query
-        self.sparql.setQuery(query)
-        self.sparql.setReturnFormat(JSON)
         self.logger.info("Checking triple existence: %s, %s, %s", subject, relation, obj)
-        results = self.sparql.query()
-        if results.response.status != 200:
-            raise Exception("Check triple existence failed with status code " + results.responses.status)
+        results = self.sparql.query(query)
+        if results.status_code != 200:
+            raise Exception("Check triple existence failed with status code " + str(results.status_code))
         try:
-            return results.convert()["boolean"]
+            return results.json()["boolean"]
         except Exception as e:
             print(e)
             return False
 
+    @staticmethod
+    def __format_subject(subject):
+        """
+        Formats a Subject as an IRI to be used inside a SPARQL query.
+
+        :param subject: triple's Subject (must be prepended by "http://dbpedia.org/resource/")
+        :type subject: str
+        :return: the Subject in SPARQL format
+        :rtype: str
+        """
+        return "<" + subject + ">"
+
+    @staticmethod
+    def __format_relation(relation):
+        """
+        Formats a Relation to be used inside a SPARQL query, in the same way as check_triple_existence does.
+
+        :param relation: triple's Relation/predicate/property
+        :type relation: str
+        :return: the Relation in SPARQL format
+        :rtype: str
+        """
+        if relation.startswith("http://") and not relation.startswith(DBPEDIA_ONTOLOGY):
+            return "<" + relation + ">"
+        return "dbo:{}".format(urllib.parse.quote(relation.rsplit('/')[-1]))
+
+    @staticmethod
+    def __format_object(obj):
+        """
+        Formats an Object to be used inside a SPARQL query, either as an IRI or as an escaped literal String.
+
+        :param obj: triple's Object
+        :type obj: str
+        :return: the Object in SPARQL format
+        :rtype: str
+        """
+        if obj.startswith("http://"):
+            return "<" + obj + ">"
+        return '"{}"'.format(obj.replace('\\', '\\\\').replace('"', '\\"'))
+
+    @staticmethod
+    def __format_data_object(obj):
+        """
+        Formats an Object to be inserted or deleted, in the same way as insert_triple and delete_triple do: only DBpedia
+        resources are IRIs, anything else is an escaped literal String.
+
+        :param obj: triple's Object
+        :type obj: str
+        :return: the Object in SPARQL format
+        :rtype: str
+        """
+        if obj.startswith(DBPEDIA_RESOURCE):
+            return "<" + obj + ">"
+        return '"{}"'.format(obj.replace('\\', '\\\\').replace('"', '\\"'))
+
     def get_triples(self, subject, relation, transitive=False):
         """
         Get triples from Knowledge Graph that have the given Subject and Relation.
@@ -137,6 +406,25 @@ class KnowledgeGraphWrapper:
         :type transitive: bool
         :rtype: list or None
         """
+        objects = self.__cached(('triples', subject, relation.rsplit('/')[-1], transitive),
+                                lambda: self.__query_triple_objects(subject, relation, transitive))
+        if objects is not None:
+            return [Triple(subject, relation, [obj]) for obj in objects]
+        return None
+
+    def __query_triple_objects(self, subject, relation, transitive=False):
+        """
+        Queries the Knowledge Graph for the Objects of the given Subject and Relation.
+
+        :param subject: triple's Subject (must be prepended by "http://dbpedia.org/resource/")
+        :type subject: str
+        :param relation: triple's Relation (must be prepended by "http://dbpedia.org/ontology/")
+        :type relation: str
+        :param transitive: whether a check should also be done for entities that are in the sameAs Relation with the Subject
+        :type transitive: bool
+        :return: list of Objects, or None if such triple doesn't exist
+        :rtype: list or None
+        """
         query = """
                 PREFIX : <http://dbpedia.org/resource/>
                 SELECT ?o WHERE{{
@@ -145,16 +433,14 @@ class KnowledgeGraphWrapper:
                 """.format(subject, urllib.parse.quote(relation.rsplit('/')[-1]))
         if transitive:
             query = "DEFINE input:same-as \"yes\"" + query
-        self.sparql.setQuery(query)
-        self.sparql.setReturnFormat(JSON)
         self.logger.info("Getting triples given relation: %s, %s", subject, relation)
-        results = self.sparql.query()
-        if results.response.status != 200:
-            raise Exception("Get triples given relation failed with status code " + results.responses.status)
-        results = results.convert()
+        results = self.sparql.query(query)
+        if results.status_code != 200:
+            raise Exception("Get triples given relation failed with status code " + str(results.status_code))
+        results = results.json()
         try:
             if len(results["results"]["bindings"]) > 0:
-                return [Triple(subject, relation, [res["o"]["value"]]) for res in results["results"]["bindings"]]
+                return [res["o"]["value"] for res in results["results"]["bindings"]]
         except Exception as e:
             print(e)
         return None
@@ -183,13 +469,11 @@ class KnowledgeGraphWrapper:
                 """.format(subject, obj_query)
         if transitive:
             query = "DEFINE input:same-as \"yes\"" + query
-        self.sparql.setQuery(query)
-        self.sparql.setReturnFormat(JSON)
         self.logger.info("Getting triples: %s, %s", subject, obj)
-        results = self.sparql.query()
-        if results.response.status != 200:
-            raise Exception("Get triples failed with status code " + results.responses.status)
-        results = results.convert()
+        results = self.sparql.query(query)
+        if results.status_code != 200:
+            raise Exception("Get triples failed with status code " + str(results.status_code))
+        results = results.json()
         if len(results["results"]["bindings"]) > 0:
             return [Triple(subject, res["p"]["value"], [obj]) for res in results["results"]["bindings"]]
         return None
@@ -215,13 +499,11 @@ class KnowledgeGraphWrapper:
                 """.format(subject)
         if transitive:
             query = "DEFINE input:same-as \"yes\"" + query
-        self.sparql.setQuery(query)
-        self.sparql.setReturnFormat(JSON)
         self.logger.info("Getting entity: %s,", subject)
-        results = self.sparql.query()
-        if results.response.status != 200:
-            raise Exception("Get entity failed with status code " + results.responses.status)
-        results = results.convert()
+        results = self.sparql.query(query)
+        if results.status_code != 200:
+            raise Exception("Get entity failed with status code " + str(results.status_code))
+        results = results.json()
         if len(results["results"]["bindings"]) > 0:
             return [Triple(subject, res["r"]["value"], [res["o"]["value"]]) for res in results["results"]["bindings"]]
         return None
@@ -233,8 +515,25 @@ class KnowledgeGraphWrapper:
         :param triple: a triple of type triple.Triple
         :type triple: triple.Triple
         """
-        for obj in triple.objects:
-            self.insert_triple(triple.subject, triple.relation, obj)
+        if not all(self.insert_triples_bulk([triple])):
+            raise Exception("Insert triple failed: " + triple.to_json())
+
+    def insert_triples_bulk(self, triples, max_statement_size=None):
+        """
+        Inserts triples to the Knowledge Graph, packing as many triples as possible into a single INSERT DATA request.
+        A request that fails is logged, and the triples in it are reported as not inserted.
+
+        :param triples: list of triples of type triple.Triple
+        :type triples: list
+        :param max_statement_size: maximum number of characters of the statements in a single request, defaults to
+            MAX_STATEMENT_SIZE
+        :type max_statement_size: int
+        :return: list of booleans in the same order as the triples, True if all Objects of the triple were inserted
+        :rtype: list
+        """
+        statements = [(i, triple.subject, triple.relation, obj)
+                      for i, triple in enumerate(triples) for obj in triple.objects]
+        return self.__update_bulk('INSERT', statements, len(triples), max_statement_size)
 
     def insert_triple(self, subject, relation, obj):
         """
@@ -262,13 +561,11 @@ class KnowledgeGraphWrapper:
                     }}
                 }}
                 """.format(subject, relation.rsplit('/')[-1], obj_query)
-        self.sparql.setMethod(POST)
-        self.sparql.setQuery(query)
-        self.sparql.setReturnFormat(JSON)
         self.logger.info("Inserting triple: %s, %s, %s", subject, relation, obj)
-        results = self.sparql.query()
-        if results.response.status != 200:
-            raise Exception("Insert triple failed with status code " + results.responses.status)
+        results = self.sparql.update(query)
+        if results.status_code != 200:
+            raise Exception("Insert triple failed with status code " + str(results.status_code))
+        self.__invalidate_triple(subject, relation, obj)
 
     def delete_triple_object(self, triple, transitive=False):
         """
@@ -279,12 +576,124 @@ class KnowledgeGraphWrapper:
         :param transitive: whether the delete should also be done for entities that are in the sameAs relation with the Subject
         :type transitive: bool
         """
-        for obj in triple.objects:
-            self.delete_triple(triple.subject, triple.relation, obj)
-        if transitive is True:
-            same_entities = self.get_same_entities(triple.subject)
-            for ent in same_entities:
-                self.delete_triple(ent, triple.relation, obj)
+        if not all(self.delete_triples_bulk([triple], transitive)):
+            raise Exception("Delete triple failed: " + triple.to_json())
+
+    def delete_triples_bulk(self, triples, transitive=False, max_statement_size=None):
+        """
+        Deletes triples from the Knowledge Graph, packing as many triples as possible into a single DELETE DATA request.
+        A request that fails is logged, and the triples in it are reported as not deleted.
+
+        :param triples: list of triples of type triple.Triple
+        :type triples: list
+        :param transitive: whether the delete should also be done for entities that are in the sameAs relation with the Subject
+        :type transitive: bool
+        :param max_statement_size: maximum number of characters of the statements in a single request, defaults to
+            MAX_STATEMENT_SIZE
+        :type max_statement_size: int
+        :return: list of booleans in the same order as the triples, True if all Objects of the triple were deleted
+        :rtype: list
+        """
+        statements = []
+        for i, triple in enumerate(triples):
+            subjects = [triple.subject]
+            if transitive is True:
+                subjects += self.get_same_entities(triple.subject)
+            statements += [(i, subject, triple.relation, obj) for subject in subjects for obj in triple.objects]
+        return self.__update_bulk('DELETE', statements, len(triples), max_statement_size)
+
+    def __update_bulk(self, operation, statements, count, max_statement_size=None):
+        """
+        Sends INSERT DATA or DELETE DATA requests for the statements, in as few requests as the max_statement_size
+        allows. A statement that is longer than max_statement_size is sent in a request of its own.
+        If a request is rejected with a client error, its statements are retried in two halves, until only the
+        statements that fail on their own are reported as failed.
+
+        :param operation: 'INSERT' or 'DELETE'
+        :type operation: str
+        :param statements: list of (triple index, Subject, Relation, Object) tuples
+        :type statements: list
+        :param count: number of triples the statements belong to
+        :type count: int
+        :param max_statement_size: maximum number of characters of the statements in a single request, defaults to
+            MAX_STATEMENT_SIZE
+        :type max_statement_size: int
+        :return: list of booleans for every triple, True if all statements of the triple succeeded
+        :rtype: list
+        """
+        max_statement_size = self.MAX_STATEMENT_SIZE if max_statement_size is None else max_statement_size
+        chunks = []
+        size = 0
+        for statement in statements:
+            _, subject, relation, obj = statement
+            line = '<{0}> dbo:{1} {2} .'.format(subject, relation.rsplit('/')[-1], self.__format_data_object(obj))
+            if len(chunks) == 0 or size + len(line) > max_statement_size:
+                chunks.append([])
+                size = 0
+            chunks[-1].append((statement, line))
+            size += len(line) + 1
+
+        succeeded = [True] * count
+        for chunk in chunks:
+            self.__update_chunk(operation, chunk, succeeded)
+        return succeeded
+
+    def __update_chunk(self, operation, chunk, succeeded):
+        """
+        Private method that sends a single INSERT DATA or DELETE DATA request for a chunk of statements. If the request
+        is rejected with a client error (4xx), the two halves of the chunk are sent separately, so that a bad statement
+        does not fail the others. If the request fails otherwise (server error or transport error), the whole chunk
+        fails at once.
+
+        :param operation: 'INSERT' or 'DELETE'
+        :type operation: str
+        :param chunk: list of ((triple index, Subject, Relation, Object), statement line) tuples
+        :type chunk: list
+        :param succeeded: list of booleans for every triple, which is set to False for the triples of failed statements
+        :type succeeded: list
+        """
+        query = """
+                PREFIX : <http://dbpedia.org/resource/>
+                {0} DATA
+                {{
+                  GRAPH <http://dbpedia.org>
+                  {{
+                    {1}
+                  }}
+                }}
+                """.format(operation, '\n'.join(line for _, line in chunk))
+        self.logger.info("Sending %s DATA of %d triple objects", operation, len(chunk))
+        try:
+            results = self.sparql.update(query)
+        except Exception as e:
+            # the endpoint is unreachable or timed out, so the halves would fail the same way
+            self.logger.error(e)
+            self.__fail_chunk(chunk, succeeded)
+            return
+        if results.status_code != 200:
+            self.logger.error(operation.capitalize() + " triples failed with status code " + str(results.status_code))
+            # only a client error points at a bad statement, which the halves can isolate
+            if 400 <= results.status_code < 500 and len(chunk) > 1:
+                middle = len(chunk) // 2
+                self.__update_chunk(operation, chunk[:middle], succeeded)
+                self.__update_chunk(operation, chunk[middle:], succeeded)
+            else:
+                self.__fail_chunk(chunk, succeeded)
+            return
+        self.__invalidate_triples([(subject, relation, obj) for (_, subject, relation, obj), _ in chunk])
+
+    @staticmethod
+    def __fail_chunk(chunk, succeeded):
+        """
+        Private method that marks the triples of all statements of a chunk as failed.
+
+        :param chunk: list of ((triple index, Subject, Relation, Object), statement line) tuples
+        :type chunk: list
+        :param succeeded: list of booleans for every triple
+        :type succeeded: list
+        """
+        for (i, _, _, _), _ in chunk:
+            succeeded[i] = False
 
     def delete_triple(self, subject, relation, obj):
         """
@@ -312,19 +721,28 @@ class KnowledgeGraphWrapper:
                   }}
                 }} 
                 """.format(subject, relation.rsplit('/')[-1], obj_query)
-        self.sparql.setMethod(POST)
-        self.sparql.setQuery(query)
-        self.sparql.setReturnFormat(JSON)
         self.logger.info("Deleting triple: %s, %s, %s", subject, relation, obj)
-        results = self.sparql.query()
-        if results.response.status != 200:
-            raise Exception("Delete triple failed with status code " + results.responses.status)
+        results = self.sparql.update(query)
+        if results.status_code != 200:
+            raise Exception("Delete triple failed with status code " + str(results.status_code))
+        self.__invalidate_triple(subject, relation, obj)
 
     def get_same_entities(self, entity):
         """
         Return DBpedia entities that have the owl:sameAs relation with the input.
         They should be considered as the same entity.
 
+        :param entity: a DBpedia resource/entity (must be prepended by "http://dbpedia.org/resource/")
+        :type entity: str
+        :return: a list of DBpedia entities that have the owl:sameAs relation with the input
+        :rtype: list
+        """
+        return list(self.__cached(('same', entity), lambda: self.__query_same_entities(entity)))
+
+    def __query_same_entities(self, entity):
+        """
+        Queries the Knowledge Graph for DBpedia entities that have the owl:sameAs relation with the input.
+
         :param entity: a DBpedia resource/entity (must be prepended by "http://dbpedia.org/resource/")
         :type entity: str
         :return: a list of DBpedia entities that have the owl:sameAs relation with the input
@@ -336,13 +754,11 @@ class KnowledgeGraphWrapper:
                 <{0}> owl:sameAs ?o .
                 }}
                 """.format(entity)
-        self.sparql.setQuery(query)
-        self.sparql.setReturnFormat(JSON)
         self.logger.info("Getting same entities for: %s", entity)
-        results = self.sparql.query()
-        if results.response.status != 200:
-            raise Exception("Get same entities failed with status code " + results.responses.status)
-        results = results.convert()
+        results = self.sparql.query(query)
+        if results.status_code != 200:
+            raise Exception("Get same entities failed with status code " + str(results.status_code))
+        results = results.json()
         if len(results["results"]["bindings"]) > 0:
             return [res["o"]["value"] for res in results["results"]["bindings"]]
         return []
@@ -366,13 +782,11 @@ class KnowledgeGraphWrapper:
                   }}
                 }}
                 """.format(entity_a, entity_b)
-        self.sparql.setMethod(POST)
-        self.sparql.setQuery(query)
-        self.sparql.setReturnFormat(JSON)
         self.logger.info("Inserting sameAs relation between: %s, %s", entity_a, entity_b)
-        results = self.sparql.query()
-        if results.response.status != 200:
-            raise Exception("Insert sameAs relation failed with status code " + results.responses.status)
+        results = self.sparql.update(query)
+        if results.status_code != 200:
+            raise Exception("Insert sameAs relation failed with status code " + str(results.status_code))
+        self.__invalidate_same_entities(entity_a, entity_b)
 
     def remove_sameAs_relation(self, entity_a, entity_b):
         """
@@ -393,13 +807,11 @@ class KnowledgeGraphWrapper:
                   }}
                 }}
                 """.format(entity_a, entity_b)
-        self.sparql.setMethod(POST)
-        self.sparql.setQuery(query)
-        self.sparql.setReturnFormat(JSON)
         self.logger.info("Removing sameAs relation between: %s, %s", entity_a, entity_b)
-        results = self.sparql.query()
-        if results.response.status != 200:
-            raise Exception("Removing sameAs relation failed with status code " + results.responses.status)
+        results = self.sparql.update(query)
+        if results.status_code != 200:
+            raise Exception("Removing sameAs relation failed with status code " + str(results.status_code))
+        self.__invalidate_same_entities(entity_a, entity_b)
 
     def check_sameAs_relation(self, entity_a, entity_b):
         """
@@ -417,10 +829,8 @@ class KnowledgeGraphWrapper:
                   <{1}> owl:sameAs <{0}> .
                 }}
                 """.format(entity_a, entity_b)
-        self.sparql.setQuery(query)
-        self.sparql.setReturnFormat(JSON)
         self.logger.info("Checking sameAs relation existence between: %s, %s", entity_a, entity_b)
-        results = self.sparql.query()
-        if results.response.status != 200:
-            raise Exception("Check sameAs relation existence failed with status code " + results.responses.status)
-        return results.convert()["boolean"]
+        results = self.sparql.query(query)
+        if results.status_code != 200:
+            raise Exception("Check sameAs relation existence failed with status code " + str(results.status_code))
+        return results.json()["boolean"]
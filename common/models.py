@@ -0,0 +1,45 @@
+import logging
+import neuralcoref
+import spacy
+import threading
+
+DEFAULT_MODEL = 'en_core_web_sm'
+
+_pipelines = {}
+_lock = threading.Lock()
+
+
+def get_nlp(name=DEFAULT_MODEL):
+    """
+    Returns the spaCy pipeline of the model, with neuralcoref added to it.
+    Each pipeline is loaded once per process, on its first use, and shared by all callers afterwards.
+
+    :param name: name of the spaCy model, defaults to 'en_core_web_sm'
+    :type name: str
+    :return: spaCy pipeline
+    :rtype: spacy.language.Language
+    """
+    nlp = _pipelines.get(name)
+    if nlp is None:
+        with _lock:
+            nlp = _pipelines.get(name)
+            if nlp is None:
+                logging.getLogger().info("Loading spaCy model %s", name)
+                nlp = spacy.load(name)
+                neuralcoref.add_to_pipe(nlp)
+                _pipelines[name] = nlp
+    return nlp
+
+
+def get_stopwords(name=DEFAULT_MODEL):
+    """
+    Returns the stop words of the spaCy model, excluding 'not'.
+
+    :param name: name of the spaCy model, defaults to 'en_core_web_sm'
+    :type name: str
+    :return: set of stop words
+    :rtype: set
+    """
+    stopwords = get_nlp(name).Defaults.stop_words
+    stopwords.discard('not')
+    return stopwords
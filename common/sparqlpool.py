@@ -0,0 +1,137 @@
+import logging
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+
+
+class SPARQLConnectionPool:
+    """
+    A thread-safe HTTP transport for a SPARQL endpoint, which keeps a pool of keep-alive connections.
+    Every query is sent as its own request, so there is no shared query state between threads.
+    At most pool_size requests are in flight at the same time, other requests wait for a free connection.
+
+    :param endpoint: URL of the SPARQL endpoint
+    :type endpoint: str
+    :param pool_size: maximum number of connections (and concurrent requests) to the endpoint, defaults to 10
+    :type pool_size: int
+    :param timeout: timeout of a request in seconds, defaults to 60
+    :type timeout: float
+    """
+    DEFAULT_POOL_SIZE = 10
+    DEFAULT_TIMEOUT = 60
+    RESULTS_FORMAT = 'application/sparql-results+json'
+
+    __pools = {}
+    __pools_lock = threading.Lock()
+
+    def __init__(self, endpoint, pool_size=None, timeout=None):
+        """
+        Constructor method
+        """
+        self.endpoint = endpoint
+        self.pool_size = self.DEFAULT_POOL_SIZE if pool_size is None else pool_size
+        self.timeout = self.DEFAULT_TIMEOUT if timeout is None else timeout
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.pool_size, pool_block=True)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+        self.__slots = threading.BoundedSemaphore(self.pool_size)
+        self.__metrics_lock = threading.Lock()
+        self.__in_use = 0
+        self.__max_in_use = 0
+        self.__requests = 0
+        self.__total_wait_time = 0.0
+        self.__max_wait_time = 0.0
+        self.logger = logging.getLogger()
+
+    @classmethod
+    def get_pool(cls, endpoint, pool_size=None, timeout=None):
+        """
+        Returns the connection pool of the endpoint, shared by everything in the process that talks to the same
+        endpoint. The pool is created on the first call, later calls return the same pool.
+
+        :param endpoint: URL of the SPARQL endpoint
+        :type endpoint: str
+        :param pool_size: maximum number of connections, only used when the pool is created
+        :type pool_size: int
+        :param timeout: timeout of a request in seconds, only used when the pool is created
+        :type timeout: float
+        :return: the connection pool of the endpoint
+        :rtype: SPARQLConnectionPool
+        """
+        with cls.__pools_lock:
+            if endpoint not in cls.__pools:
+                cls.__pools[endpoint] = cls(endpoint, pool_size, timeout)
+            return cls.__pools[endpoint]
+
+    def query(self, query):
+        """
+        Sends a SPARQL query (SELECT or ASK) to the endpoint.
+
+        :param query: SPARQL query
+        :type query: str
+        :return: response of the endpoint, whose JSON body is in the SPARQL results format
+        :rtype: requests.Response
+        """
+        return self.__send({'query': query})
+
+    def update(self, query):
+        """
+        Sends a SPARQL update (e.g. INSERT DATA or DELETE DATA) to the endpoint.
+
+        :param query: SPARQL update query
+        :type query: str
+        :return: response of the endpoint
+        :rtype: requests.Response
+        """
+        return self.__send({'update': query})
+
+    def metrics(self):
+        """
+        Returns the usage metrics of the pool: the number of connections currently in use, the highest number of
+        connections in use at the same time, the number of requests sent, and the time (in seconds) requests have
+        spent waiting for a free connection.
+
+        :return: dictionary of metrics
+        :rtype: dict
+        """
+        with self.__metrics_lock:
+            return {
+                'pool_size': self.pool_size,
+                'in_use': self.__in_use,
+                'max_in_use': self.__max_in_use,
+                'requests': self.__requests,
+                'total_wait_time': self.__total_wait_time,
+                'max_wait_time': self.__max_wait_time,
+                'average_wait_time': self.__total_wait_time / self.__requests if self.__requests > 0 else 0.0
+            }
+
+    def __send(self, data):
+        """
+        Sends a request with the given form data to the endpoint, once a connection is available.
+
+        :param data: form data of the request
+        :type data: dict
+        :return: response of the endpoint
+        :rtype: requests.Response
+        """
+        start = time.perf_counter()
+        self.__slots.acquire()
+        waited = time.perf_counter() - start
+        with self.__metrics_lock:
+            self.__in_use += 1
+            self.__max_in_use = max(self.__max_in_use, self.__in_use)
+            self.__requests += 1
+            self.__total_wait_time += waited
+            self.__max_wait_time = max(self.__max_wait_time, waited)
+        try:
+            return self.session.post(self.endpoint, data=data, headers={'Accept': self.RESULTS_FORMAT},
+                                     timeout=self.timeout)
+        finally:
+            with self.__metrics_lock:
+                self.__in_use -= 1
+            self.__slots.release()
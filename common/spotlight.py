@@ -0,0 +1,268 @@
+import hashlib
+import json
+import logging
+import os
+import requests
+import threading
+
+from concurrent.futures import ThreadPoolExecutor
+from dotenv import load_dotenv
+from nltk.tokenize import sent_tokenize
+from pathlib import Path
+
+from definitions import ROOT_DIR
+
+
+class SpotlightCache:
+    """
+    A persistent on-disk cache of DBpedia Spotlight responses. Every response is stored as a JSON file named after the
+    hash of the request. Once the total size of the files exceeds max_size, the least recently used files are removed.
+
+    :param cache_dir: directory of the cache files, relative to the project root if it is not absolute
+    :type cache_dir: str
+    :param max_size: maximum total size of the cache files in bytes, defaults to 100 MB
+    :type max_size: int
+    """
+    DEFAULT_MAX_SIZE = 100 * 1024 * 1024
+
+    def __init__(self, cache_dir, max_size=None):
+        """
+        Constructor method
+        """
+        self.cache_dir = Path(ROOT_DIR, cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.max_size = self.DEFAULT_MAX_SIZE if max_size is None else max_size
+        self.__size = sum(file.stat().st_size for file in self.cache_dir.glob('*.json'))
+        self.__lock = threading.Lock()
+        self.logger = logging.getLogger()
+
+    @staticmethod
+    def key(url, params):
+        """
+        Returns the cache key of a request, which is the hash of the Spotlight URL and all request parameters
+        (including the text).
+
+        :param url: Spotlight URL
+        :type url: str
+        :param params: request parameters
+        :type params: dict
+        :return: cache key
+        :rtype: str
+        """
+        request = json.dumps({'url': url, 'params': params}, sort_keys=True, ensure_ascii=False)
+        return hashlib.sha256(request.encode('utf-8')).hexdigest()
+
+    def get(self, key):
+        """
+        Returns the cached response of the key, and marks it as recently used.
+
+        :param key: cache key
+        :type key: str
+        :return: the cached response, or None if it is not cached
+        :rtype: dict or None
+        """
+        path = self.cache_dir / (key + '.json')
+        try:
+            with open(path, encoding='utf-8') as file:
+                response = json.load(file)
+            os.utime(path)
+            return response
+        except (OSError, ValueError):
+            return None
+
+    def set(self, key, response):
+        """
+        Caches the response of the key, and removes the least recently used responses if the cache is too big.
+
+        :param key: cache key
+        :type key: str
+        :param response: Spotlight response
+        :type response: dict
+        """
+        path = self.cache_dir / (key + '.json')
+        temp_path = self.cache_dir / (key + '.tmp')
+        try:
+            with open(temp_path, 'w', encoding='utf-8') as file:
+                json.dump(response, file)
+            os.replace(temp_path, path)
+            size = path.stat().st_size
+        except OSError as e:
+            self.logger.error('Failed to cache Spotlight response: %s', e)
+            return
+        with self.__lock:
+            self.__size += size
+            if self.__size > self.max_size:
+                self.__evict()
+
+    def evict(self):
+        """
+        Removes the least recently used responses until the total size of the cache is within max_size.
+        """
+        with self.__lock:
+            self.__evict()
+
+    def __evict(self):
+        files = []
+        for file in self.cache_dir.glob('*.json'):
+            try:
+                stat = file.stat()
+            except OSError:
+                continue
+            files.append((stat.st_mtime, stat.st_size, file))
+        files.sort()
+        self.__size = sum(size for _, size, _ in files)
+        for _, size, file in files:
+            if self.__size <= self.max_size:
+                break
+            try:
+                file.unlink()
+                self.__size -= size
+            except OSError:
+                pass
+
+
+class SpotlightClient:
+    """
+    A DBpedia Spotlight client, whose responses can be cached on disk.
+    Unless they are given, the settings are read from the SPOTLIGHT_URL, SPOTLIGHT_CACHE_DIR, SPOTLIGHT_CACHE_MAX_SIZE,
+    and SPOTLIGHT_OFFLINE environment variables. The cache is disabled if no cache directory is set.
+
+    :param url: Spotlight annotate endpoint URL
+    :type url: str
+    :param cache_dir: directory of the response cache
+    :type cache_dir: str
+    :param max_cache_size: maximum total size of the response cache in bytes
+    :type max_cache_size: int
+    :param offline: whether responses are only served from the cache, without sending requests to Spotlight
+    :type offline: bool
+    """
+    DEFAULT_URL = 'https://api.dbpedia-spotlight.org/en/annotate?'
+    WINDOW_LENGTH = 5000  # maximum number of characters of a window of sentences annotated by a single request
+    WINDOW_OVERLAP = 2  # number of sentences shared by consecutive windows, giving context to entities at the edges
+    WORKERS = 4  # number of windows annotated concurrently
+
+    def __init__(self, url=None, cache_dir=None, max_cache_size=None, offline=None):
+        """
+        Constructor method
+        """
+        load_dotenv(dotenv_path=Path(ROOT_DIR, '.env'))
+        self.url = url or os.getenv('SPOTLIGHT_URL') or self.DEFAULT_URL
+        cache_dir = cache_dir or os.getenv('SPOTLIGHT_CACHE_DIR')
+        if max_cache_size is None and os.getenv('SPOTLIGHT_CACHE_MAX_SIZE'):
+            max_cache_size = int(os.getenv('SPOTLIGHT_CACHE_MAX_SIZE'))
+        self.cache = SpotlightCache(cache_dir, max_cache_size) if cache_dir else None
+        if offline is None:
+            offline = os.getenv('SPOTLIGHT_OFFLINE', 'false').lower() == 'true'
+        self.offline = offline
+        self.logger = logging.getLogger()
+
+    def annotate(self, text, **params):
+        """
+        Annotates the text with DBpedia entities, using the cached response if there is one.
+
+        :param text: text to be annotated
+        :type text: str
+        :param params: other Spotlight request parameters, e.g. confidence
+        :type params: dict
+        :return: Spotlight response, or None if the request failed or there is no cached response in offline mode
+        :rtype: dict or None
+        """
+        params = {**params, 'text': text}
+        key = SpotlightCache.key(self.url, params) if self.cache is not None else None
+        if key is not None:
+            response = self.cache.get(key)
+            if response is not None:
+                return response
+        if self.offline:
+            self.logger.warning('Spotlight response is not cached, and Spotlight is in offline mode')
+            return None
+
+        try:
+            response = requests.post(self.url, data=params, headers={'Accept': 'application/json'})
+        except requests.exceptions.RequestException as e:
+            self.logger.error(e)
+            return None
+        if response.status_code != 200:
+            self.logger.error(response.text)
+        try:
+            response = response.json()
+        except json.decoder.JSONDecodeError as e:
+            self.logger.error(e.msg)
+            return None
+
+        if key is not None and 'Resources' in response:
+            self.cache.set(key, response)
+        return response
+
+    def annotate_document(self, document, sentences=None, **params):
+        """
+        Annotates the document with DBpedia entities. Documents longer than WINDOW_LENGTH are split into overlapping
+        windows of sentences, which are annotated concurrently (and cached separately). The resources of all windows are
+        merged, with their @offset relative to the whole document, and the ones spotted at the same offset by
+        overlapping windows are only included once.
+
+        :param document: document to be annotated
+        :type document: str
+        :param sentences: sentences of the document, in order, defaults to the sentences split by NLTK
+        :type sentences: list
+        :param params: other Spotlight request parameters, e.g. confidence
+        :type params: dict
+        :return: Spotlight response, or None if the annotation of every window failed
+        :rtype: dict or None
+        """
+        if len(document) <= self.WINDOW_LENGTH:
+            return self.annotate(document, **params)
+
+        windows = self.__get_windows(document, sentences if sentences is not None else sent_tokenize(document))
+        with ThreadPoolExecutor(max_workers=self.WORKERS) as executor:
+            responses = list(executor.map(lambda window: self.annotate(document[window[0]:window[1]], **params),
+                                          windows))
+        if all(response is None for response in responses):
+            return None
+
+        resources = {}
+        for (start, _), response in zip(windows, responses):
+            if response is None:
+                continue
+            # Spotlight offsets count UTF-16 code units, as Java strings do
+            window_offset = len(document[:start].encode('utf-16-le')) // 2
+            for resource in response.get('Resources', []):
+                offset = int(resource.get('@offset', 0)) + window_offset
+                key = (offset, resource['@surfaceForm'])
+                if key not in resources:
+                    resources[key] = {**resource, '@offset': str(offset)}
+        return {'@text': document, 'Resources': [resources[key] for key in sorted(resources)]}
+
+    def __get_windows(self, document, sentences):
+        """
+        Splits the document into windows of consecutive sentences of at most WINDOW_LENGTH characters (unless a single
+        sentence is longer), where every window starts WINDOW_OVERLAP sentences before the end of the previous one.
+
+        :param document: document
+        :type document: str
+        :param sentences: sentences of the document, in order
+        :type sentences: list
+        :return: list of (start, end) character offsets of the windows in the document
+        :rtype: list
+        """
+        spans = []
+        position = 0
+        for sentence in sentences:
+            start = document.find(sentence, position)
+            if start == -1:
+                continue
+            position = start + len(sentence)
+            spans.append((start, position))
+        if len(spans) == 0:
+            return [(0, len(document))]
+
+        windows = []
+        i = 0
+        while True:
+            j = i + 1
+            while j < len(spans) and spans[j][1] - spans[i][0] <= self.WINDOW_LENGTH:
+                j += 1
+            windows.append((spans[i][0], spans[j - 1][1]))
+            if j == len(spans):
+                return windows
+            i = max(j - self.WINDOW_OVERLAP, i + 1)
@@ -0,0 +1,64 @@
+import unittest
+from mock import patch
+
+from ..cache import LRUCache
+
+
+class TestLRUCache(unittest.TestCase):
+
+    def test_get_and_set(self):
+        cache = LRUCache(2)
+        cache.set('a', None)
+
+        self.assertIsNone(cache.get('a'))
+        self.assertIs(LRUCache.MISSING, cache.get('b'))
+        self.assertEqual({'size': 1, 'maxsize': 2, 'hits': 1, 'misses': 1, 'evictions': 0}, cache.stats())
+
+    def test_least_recently_used_evicted(self):
+        cache = LRUCache(2)
+        cache.set('a', 1)
+        cache.set('b', 2)
+        cache.get('a')
+        cache.set('c', 3)
+
+        self.assertIn('a', cache)
+        self.assertNotIn('b', cache)
+        self.assertIn('c', cache)
+        self.assertEqual(1, cache.evictions)
+
+    @patch('common.cache.time.monotonic')
+    def test_ttl(self, mock_monotonic):
+        mock_monotonic.return_value = 100
+        cache = LRUCache(2, ttl=10)
+        cache.set('a', 1)
+
+        mock_monotonic.return_value = 105
+        self.assertEqual(1, cache.get('a'))
+        mock_monotonic.return_value = 111
+        self.assertIs(LRUCache.MISSING, cache.get('a'))
+        self.assertEqual(0, len(cache))
+
+    def test_set_after_invalidation_skipped(self):
+        cache = LRUCache(2)
+        generation = cache.generation
+        cache.invalidate('a')
+
+        # the value was computed before the invalidation
+        self.assertFalse(cache.set('a', 1, generation))
+        self.assertNotIn('a', cache)
+        self.assertTrue(cache.set('a', 1, cache.generation))
+        self.assertIn('a', cache)
+
+    def test_invalidate_where(self):
+        cache = LRUCache(5)
+        cache.set(('triples', 'a'), 1)
+        cache.set(('triples', 'b'), 2)
+        cache.set(('same', 'a'), 3)
+        cache.invalidate_where(lambda key: key[1] == 'a')
+
+        self.assertEqual([('triples', 'b')], [key for key in [('triples', 'a'), ('triples', 'b'), ('same', 'a')]
+                                               if key in cache])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,221 @@
+import responses
+import unittest
+from mock import patch
+from urllib.parse import parse_qs
+
+from ..kgwrapper import KnowledgeGraphWrapper
+from ..triple import Triple
+from ..utils import DBPEDIA_RESOURCE, DBPEDIA_ONTOLOGY
+
+
+@patch.dict('os.environ', {'SPARQL_ENDPOINT': 'http://localhost:8890/sparql'})
+class TestKnowledgeGraphWrapper(unittest.TestCase):
+
+    endpoint = 'http://localhost:8890/sparql'
+    triple_1 = Triple(DBPEDIA_RESOURCE + 'John_Doe', DBPEDIA_ONTOLOGY + 'ignore',
+                      [DBPEDIA_RESOURCE + 'Social_distancing'])
+    triple_2 = Triple(DBPEDIA_RESOURCE + 'John_Doe', DBPEDIA_ONTOLOGY + 'marry',
+                      [DBPEDIA_RESOURCE + 'Jane_Doe', 'Jane "JD" Doe'])
+
+    @responses.activate
+    def test_check_triples_existence_bulk(self):
+        # rows: 0 -> triple_1, 1 and 2 -> triple_2
+        responses.add(responses.POST, self.endpoint,
+                      json={'results': {'bindings': [{'row': {'value': '0'}}, {'row': {'value': '1'}}]}}, status=200)
+
+        kg = KnowledgeGraphWrapper()
+        result = kg.check_triples_existence_bulk([self.triple_1, self.triple_2])
+
+        self.assertEqual([True, False], result)
+        self.assertEqual(1, len(responses.calls))
+        query = parse_qs(responses.calls[0].request.body)['query'][0]
+        self.assertIn('VALUES (?row ?s ?p ?o)', query)
+        self.assertIn('"Jane \\"JD\\" Doe"', query)
+
+    @responses.activate
+    def test_check_triples_existence_bulk_chunked(self):
+        responses.add(responses.POST, self.endpoint,
+                      json={'results': {'bindings': [{'row': {'value': '0'}}]}}, status=200)
+
+        kg = KnowledgeGraphWrapper()
+        kg.BULK_QUERY_SIZE = 2
+        result = kg.check_triples_existence_bulk([self.triple_1, self.triple_2, self.triple_1])
+
+        # 4 rows in chunks of 2: the first row of each chunk exists (triple_1 and the second object of triple_2)
+        self.assertEqual([True, False, False], result)
+        self.assertEqual(2, len(responses.calls))
+
+    @responses.activate
+    def test_check_triples_existence_bulk_empty(self):
+        kg = KnowledgeGraphWrapper()
+
+        self.assertEqual([], kg.check_triples_existence_bulk([]))
+        self.assertEqual(0, len(responses.calls))
+
+    @responses.activate
+    def test_check_resources_existence_bulk(self):
+        responses.add(responses.POST, self.endpoint,
+                      json={'results': {'bindings': [{'r': {'value': DBPEDIA_RESOURCE + 'Jane_Doe'}}]}}, status=200)
+
+        kg = KnowledgeGraphWrapper(cache_size=10)
+        kg.cache.clear()
+        resources = [DBPEDIA_RESOURCE + 'Jane_Doe', DBPEDIA_RESOURCE + 'J_Doe', DBPEDIA_RESOURCE + 'Jane_Doe']
+        first = kg.check_resources_existence_bulk(resources)
+        # both the existing and the missing resources are cached
+        second = kg.check_resources_existence_bulk(resources)
+
+        self.assertEqual({DBPEDIA_RESOURCE + 'Jane_Doe'}, first)
+        self.assertEqual(first, second)
+        self.assertEqual(1, len(responses.calls))
+        query = parse_qs(responses.calls[0].request.body)['query'][0]
+        self.assertEqual(1, query.count('<' + DBPEDIA_RESOURCE + 'Jane_Doe>'))
+        self.assertFalse(kg.check_resource_existence(DBPEDIA_RESOURCE + 'J_Doe'))
+
+    @responses.activate
+    def test_insert_triple_sends_update(self):
+        responses.add(responses.POST, self.endpoint, body='', status=200)
+
+        kg = KnowledgeGraphWrapper()
+        kg.insert_triple_object(self.triple_1)
+
+        body = parse_qs(responses.calls[0].request.body)
+        self.assertNotIn('query', body)
+        self.assertIn('INSERT DATA', body['update'][0])
+
+    @responses.activate
+    def test_query_failed(self):
+        responses.add(responses.POST, self.endpoint, body='', status=500)
+
+        kg = KnowledgeGraphWrapper()
+
+        with self.assertRaises(Exception):
+            kg.check_resource_existence(self.triple_1.subject)
+
+    @responses.activate
+    def test_cache_invalidated_by_insert(self):
+        responses.add(responses.POST, self.endpoint,
+                      json={'results': {'bindings': [{'o': {'value': DBPEDIA_RESOURCE + 'Jane_Doe'}}]}}, status=200)
+
+        kg = KnowledgeGraphWrapper(cache_size=10)
+        kg.cache.clear()
+        first = kg.get_triples(self.triple_2.subject, self.triple_2.relation)
+        second = kg.get_triples(self.triple_2.subject, self.triple_2.relation)
+
+        self.assertEqual(first, second)
+        self.assertEqual(1, len(responses.calls))
+
+        # a write through another wrapper of the same endpoint invalidates the cached result
+        KnowledgeGraphWrapper(cache_size=10).insert_triple(self.triple_2.subject, self.triple_2.relation, 'Jane')
+        kg.get_triples(self.triple_2.subject, self.triple_2.relation)
+
+        self.assertEqual(3, len(responses.calls))
+        self.assertEqual(1, kg.cache.hits)
+
+    @responses.activate
+    def test_result_read_before_write_not_cached(self):
+        kg = KnowledgeGraphWrapper(cache_size=10)
+        kg.cache.clear()
+
+        def callback(request):
+            # a write through another wrapper while the query is running
+            kg.cache.invalidate_where(lambda key: True)
+            return 200, {}, '{"results": {"bindings": []}}'
+        responses.add_callback(responses.POST, self.endpoint, callback=callback)
+        kg.get_triples(self.triple_2.subject, self.triple_2.relation)
+
+        self.assertEqual(0, len(kg.cache))
+
+    @responses.activate
+    def test_cache_invalidated_once_per_bulk_chunk(self):
+        responses.add(responses.POST, self.endpoint, body='', status=200)
+
+        kg = KnowledgeGraphWrapper(cache_size=10)
+        kg.cache.clear()
+        kg.cache.set(('triples', self.triple_1.subject, 'ignore', False), [])
+        kg.cache.set(('triples', self.triple_1.subject, 'birthPlace', False), [])
+        with patch.object(kg.cache, 'invalidate_where', wraps=kg.cache.invalidate_where) as invalidate_where:
+            kg.insert_triples_bulk([self.triple_1, self.triple_2])
+
+        self.assertEqual(1, invalidate_where.call_count)
+        self.assertNotIn(('triples', self.triple_1.subject, 'ignore', False), kg.cache)
+        self.assertIn(('triples', self.triple_1.subject, 'birthPlace', False), kg.cache)
+
+    @responses.activate
+    def test_insert_triples_bulk(self):
+        responses.add(responses.POST, self.endpoint, body='', status=200)
+
+        kg = KnowledgeGraphWrapper()
+        result = kg.insert_triples_bulk([self.triple_1, self.triple_2])
+
+        self.assertEqual([True, True], result)
+        self.assertEqual(1, len(responses.calls))
+        update = parse_qs(responses.calls[0].request.body)['update'][0]
+        self.assertIn('INSERT DATA', update)
+        self.assertIn('<http://dbpedia.org/resource/John_Doe> dbo:marry "Jane \\"JD\\" Doe" .', update)
+
+    @responses.activate
+    def test_insert_triples_bulk_max_statement_size(self):
+        responses.add(responses.POST, self.endpoint, body='', status=200)
+        responses.add(responses.POST, self.endpoint, body='', status=500)
+        responses.add(responses.POST, self.endpoint, body='', status=200)
+
+        kg = KnowledgeGraphWrapper()
+        # every statement is sent on its own, and the statement of the first object of triple_2 fails
+        result = kg.insert_triples_bulk([self.triple_1, self.triple_2], max_statement_size=1)
+
+        self.assertEqual([True, False], result)
+        self.assertEqual(3, len(responses.calls))
+
+    @responses.activate
+    def test_insert_triples_bulk_failed_chunk_split(self):
+        def callback(request):
+            return (400 if 'Bad_IRI' in parse_qs(request.body)['update'][0] else 200), {}, ''
+        responses.add_callback(responses.POST, self.endpoint, callback=callback)
+
+        kg = KnowledgeGraphWrapper()
+        bad_triple = Triple(DBPEDIA_RESOURCE + 'Bad_IRI', DBPEDIA_ONTOLOGY + 'ignore',
+                            [DBPEDIA_RESOURCE + 'Social_distancing'])
+        result = kg.insert_triples_bulk([self.triple_1, bad_triple, self.triple_2])
+
+        # only the triple of the bad statement fails, after its chunk is split in halves
+        self.assertEqual([True, False, True], result)
+        self.assertEqual(5, len(responses.calls))
+
+    @responses.activate
+    def test_insert_triples_bulk_failed_chunk_not_split_on_server_error(self):
+        responses.add(responses.POST, self.endpoint, body='', status=503)
+
+        kg = KnowledgeGraphWrapper()
+        result = kg.insert_triples_bulk([self.triple_1, self.triple_2])
+
+        self.assertEqual([False, False], result)
+        self.assertEqual(1, len(responses.calls))
+
+    @responses.activate
+    def test_insert_triples_bulk_failed_chunk_not_split_on_connection_error(self):
+        responses.add(responses.POST, self.endpoint, body=ConnectionError('Connection refused'))
+
+        kg = KnowledgeGraphWrapper()
+        result = kg.insert_triples_bulk([self.triple_1, self.triple_2])
+
+        self.assertEqual([False, False], result)
+        self.assertEqual(1, len(responses.calls))
+
+    @responses.activate
+    def test_delete_triples_bulk_transitive(self):
+        responses.add(responses.POST, self.endpoint,
+                      json={'results': {'bindings': [{'o': {'value': DBPEDIA_RESOURCE + 'J_Doe'}}]}}, status=200)
+        responses.add(responses.POST, self.endpoint, body='', status=200)
+
+        kg = KnowledgeGraphWrapper()
+        result = kg.delete_triples_bulk([self.triple_2], transitive=True)
+
+        self.assertEqual([True], result)
+        self.assertEqual(2, len(responses.calls))
+        update = parse_qs(responses.calls[1].request.body)['update'][0]
+        self.assertIn('DELETE DATA', update)
+        self.assertEqual(4, update.count(' dbo:marry '))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,39 @@
+import responses
+import unittest
+
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import parse_qs
+
+from ..sparqlpool import SPARQLConnectionPool
+
+
+class TestSPARQLConnectionPool(unittest.TestCase):
+
+    endpoint = 'http://localhost:8890/sparql'
+
+    def test_get_pool_is_shared(self):
+        pool = SPARQLConnectionPool.get_pool('http://localhost:8891/sparql', pool_size=3)
+
+        self.assertIs(pool, SPARQLConnectionPool.get_pool('http://localhost:8891/sparql'))
+        self.assertEqual(3, pool.pool_size)
+
+    @responses.activate
+    def test_concurrent_queries(self):
+        responses.add(responses.POST, self.endpoint, json={'boolean': True}, status=200)
+        pool = SPARQLConnectionPool(self.endpoint, pool_size=2)
+        queries = ['ASK {{ <http://dbpedia.org/resource/{0}> ?p ?o . }}'.format(i) for i in range(10)]
+
+        with ThreadPoolExecutor(max_workers=5) as executor:
+            results = list(executor.map(pool.query, queries))
+
+        self.assertTrue(all(result.json()['boolean'] for result in results))
+        sent = sorted(parse_qs(call.request.body)['query'][0] for call in responses.calls)
+        self.assertEqual(sorted(queries), sent)
+        metrics = pool.metrics()
+        self.assertEqual(10, metrics['requests'])
+        self.assertEqual(0, metrics['in_use'])
+        self.assertLessEqual(metrics['max_in_use'], 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,106 @@
+import json
+import tempfile
+import threading
+import unittest
+
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from urllib.parse import parse_qs
+
+from ..spotlight import SpotlightClient
+
+
+class StubSpotlightHandler(BaseHTTPRequestHandler):
+    requests = []
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers['Content-Length'])).decode('utf-8')
+        text = parse_qs(body)['text'][0]
+        StubSpotlightHandler.requests.append(text)
+        offset = text.find('John Doe')
+        # offsets count UTF-16 code units, as in Spotlight
+        resources = [{'@URI': 'http://dbpedia.org/resource/John_Doe', '@surfaceForm': 'John Doe',
+                      '@offset': str(len(text[:offset].encode('utf-16-le')) // 2)}] if offset != -1 else []
+        body = json.dumps({'@text': text, 'Resources': resources})
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.end_headers()
+        self.wfile.write(body.encode('utf-8'))
+
+    def log_message(self, format, *args):
+        pass
+
+
+class TestSpotlightClient(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.server = HTTPServer(('localhost', 0), StubSpotlightHandler)
+        cls.url = 'http://localhost:{0}/annotate'.format(cls.server.server_port)
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def setUp(self):
+        StubSpotlightHandler.requests = []
+        self.cache_dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.cache_dir.cleanup()
+
+    def test_annotate_cached(self):
+        client = SpotlightClient(self.url, cache_dir=self.cache_dir.name)
+        first = client.annotate('John Doe ignored social distancing.')
+        # a new client reads the response cached on disk by the previous one
+        second = SpotlightClient(self.url, cache_dir=self.cache_dir.name).annotate(
+            'John Doe ignored social distancing.')
+
+        self.assertEqual(first, second)
+        self.assertEqual('John Doe', second['Resources'][0]['@surfaceForm'])
+        self.assertEqual(['John Doe ignored social distancing.'], StubSpotlightHandler.requests)
+
+        client.annotate('John Doe ignored social distancing.', confidence=0.5)
+        self.assertEqual(2, len(StubSpotlightHandler.requests))
+
+    def test_annotate_offline(self):
+        client = SpotlightClient(self.url, cache_dir=self.cache_dir.name)
+        client.annotate('John Doe ignored social distancing.')
+        offline_client = SpotlightClient(self.url, cache_dir=self.cache_dir.name, offline=True)
+
+        self.assertIsNotNone(offline_client.annotate('John Doe ignored social distancing.'))
+        self.assertIsNone(offline_client.annotate('Jane Doe ignored social distancing.'))
+        self.assertEqual(1, len(StubSpotlightHandler.requests))
+
+    def test_cache_eviction(self):
+        client = SpotlightClient(self.url, cache_dir=self.cache_dir.name, max_cache_size=200)
+        for i in range(5):
+            client.annotate('John Doe {0}.'.format(i))
+        client.annotate('John Doe 4.')
+
+        # only the most recently used response fits in the cache
+        self.assertEqual(5, len(StubSpotlightHandler.requests))
+        self.assertEqual(1, len(list(client.cache.cache_dir.glob('*.json'))))
+        client.annotate('John Doe 0.')
+        self.assertEqual(6, len(StubSpotlightHandler.requests))
+
+    def test_annotate_document_chunked(self):
+        sentences = ['Société Générale hired John Doe.', 'He is a trader \U0001F4C8.', 'John Doe lives in Paris.',
+                     'It rains.']
+        document = ' '.join(sentences)
+        client = SpotlightClient(self.url)
+        client.WINDOW_LENGTH = 45
+        client.WINDOW_OVERLAP = 1
+        response = client.annotate_document(document, sentences=sentences)
+
+        # windows: sentences 1, 2-3, and 3-4, so the second John Doe is spotted twice
+        self.assertEqual(3, len(StubSpotlightHandler.requests))
+        self.assertEqual(document, response['@text'])
+        offsets = [int(resource['@offset']) for resource in response['Resources']]
+        # the emoji before the second John Doe is two UTF-16 code units
+        self.assertEqual([document.find('John Doe'), document.rfind('John Doe') + 1], offsets)
+
+
+if __name__ == '__main__':
+    unittest.main()
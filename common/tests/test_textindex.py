@@ -0,0 +1,61 @@
+import random
+import unittest
+
+from ..textindex import MultiPatternMatcher, PhraseIndex
+
+
+class TestPhraseIndex(unittest.TestCase):
+
+    phrases = ['john doe', 'social distancing', 'the prime minister']
+
+    def test_contains(self):
+        index = PhraseIndex(self.phrases)
+
+        self.assertIn('john doe', index)
+        self.assertNotIn('john', index)
+
+    def test_contains_substring(self):
+        index = PhraseIndex(self.phrases)
+
+        self.assertTrue(index.contains_substring('social distancing'))
+        self.assertTrue(index.contains_substring('prime minister'))
+        self.assertFalse(index.contains_substring('doe social'))
+        self.assertFalse(index.contains_substring('john doe\x00social'))
+
+    def test_contains_substring_empty(self):
+        self.assertFalse(PhraseIndex([]).contains_substring(''))
+        self.assertTrue(PhraseIndex(self.phrases).contains_substring(''))
+
+    def test_same_as_scanning_phrases(self):
+        rng = random.Random(0)
+        phrases = [''.join(rng.choice('ab ') for _ in range(rng.randint(1, 6))) for _ in range(30)]
+        index = PhraseIndex(phrases)
+        for _ in range(500):
+            text = ''.join(rng.choice('ab ') for _ in range(rng.randint(0, 4)))
+            self.assertEqual(text in phrases or any(text in phrase for phrase in phrases),
+                             index.contains_substring(text))
+
+
+class TestMultiPatternMatcher(unittest.TestCase):
+
+    def test_first_match(self):
+        matcher = MultiPatternMatcher(['Boris Johnson', 'Johnson', 'UK'])
+
+        self.assertEqual(0, matcher.first_match('Prime Minister Boris Johnson'))
+        self.assertEqual(1, matcher.first_match('Mr Johnson'))
+        self.assertEqual(2, matcher.first_match('the UK government'))
+        self.assertIsNone(matcher.first_match('the government'))
+
+    def test_same_as_scanning_patterns(self):
+        rng = random.Random(0)
+        for _ in range(100):
+            patterns = [''.join(rng.choice('abc') for _ in range(rng.randint(0, 4))) for _ in range(rng.randint(0, 10))]
+            matcher = MultiPatternMatcher(patterns)
+            for _ in range(20):
+                text = ''.join(rng.choice('abcd') for _ in range(rng.randint(0, 10)))
+                self.assertEqual(next((i for i, pattern in enumerate(patterns) if pattern in text), None),
+                                 matcher.first_match(text))
+
+
+if __name__ == '__main__':
+    unittest.main()
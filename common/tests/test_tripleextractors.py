@@ -29,6 +29,26 @@ class TestTripleExtractors(unittest.TestCase):
         self.assertEqual(triple_1, triples[0])
         self.assertEqual(triple_2, triples[1])
 
+    @patch('common.tripleextractors.StanfordCoreNLP')
+    def test_stanford_extractor_document(self, mock_stanford):
+        # CoreNLP splits the second sentence into two sentences
+        mock_stanford.return_value.annotate.return_value = '{"sentences": [' \
+            '{"tokens": [{"characterOffsetBegin": 0}], "openie": [' \
+            '{"subject": "John Doe", "relation": "ignored", "object": "social distancing"}]},' \
+            '{"tokens": [{"characterOffsetBegin": 36}], "openie": []},' \
+            '{"tokens": [{"characterOffsetBegin": 51}], "openie": [' \
+            '{"subject": "He", "relation": "was", "object": "fined"}]}' \
+            ']}'
+        sentences = [self.text, "He went out; he was fined.", "Nothing happened."]
+        triple_1 = Triple("John Doe", "ignored", ["social distancing"])
+        triple_2 = Triple("He", "was", ["fined"])
+
+        extractor = StanfordExtractor()
+        triples = extractor.extract_document(sentences)
+
+        mock_stanford.return_value.annotate.assert_called_once()
+        self.assertEqual([[triple_1], [triple_2], []], triples)
+
 
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
@@ -1,9 +1,11 @@
 import responses
 import spacy
+import tempfile
 import unittest
 
 from mock import patch
 
+from ..spotlight import SpotlightClient
 from ..triple import Triple
 from ..tripleproducer import TripleProducer
 
@@ -25,6 +27,16 @@ class TestTripleProducer(unittest.TestCase):
 
         self.assertEqual([triples], extracted_triples)
 
+    @patch('common.tripleproducer.StanfordExtractor')
+    def test_extract_triples_failed_sentence(self, mock_stanford):
+        triple = Triple("John Doe", "ignored", ["social distancing"])
+        mock_stanford.return_value.extract.side_effect = [[triple], Exception('CoreNLP error'), [triple]]
+
+        producer = TripleProducer()
+        extracted_triples = producer.extract_triples([self.text, self.text, self.text], max_workers=1)
+
+        self.assertEqual([[triple], [], [triple]], extracted_triples)
+
     @patch('common.tripleproducer.StanfordExtractor')
     def test_remove_stopwords(self, mock_stanford):
         with_stopword = Triple("John Doe", "ignored", ["the distancing"])
@@ -70,7 +82,7 @@ class TestTripleProducer(unittest.TestCase):
     @patch('common.tripleproducer.StanfordExtractor')
     @responses.activate
     def test_spot_entities_with_context(self, mock_stanford):
-        responses.add(responses.GET, 'https://api.dbpedia-spotlight.org/en/annotate?text=John+Doe+ignored+social+distancing.',
+        responses.add(responses.POST, 'https://api.dbpedia-spotlight.org/en/annotate?',
                       json={
                             "Resources": [
                                 {
@@ -88,14 +100,19 @@ class TestTripleProducer(unittest.TestCase):
         spotted_triple = Triple("http://dbpedia.org/resource/John_Doe", "ignored", ["http://dbpedia.org/resource/Social_distancing"])
 
         producer = TripleProducer()
-        result = producer.spot_entities_with_context(self.text, [[triple]])
+        # a cache of its own, so that responses cached by the .env settings are neither read nor written
+        with tempfile.TemporaryDirectory() as cache_dir:
+            producer.spotlight = SpotlightClient('https://api.dbpedia-spotlight.org/en/annotate?',
+                                                 cache_dir=cache_dir, offline=False)
+            result = producer.spot_entities_with_context(self.text, [[triple]])
 
         self.assertEqual([[spotted_triple]], result)
+        self.assertEqual('text=John+Doe+ignored+social+distancing.', responses.calls[0].request.body)
 
     @patch('common.tripleproducer.StanfordExtractor')
     @patch('common.tripleproducer.KnowledgeGraphWrapper')
     def test_spot_local_entities_object_not_exist(self, mock_kg, mock_stanford):
-        mock_kg.return_value.check_resource_existence.return_value = False
+        mock_kg.return_value.check_resources_existence_bulk.return_value = set()
 
         triple = Triple("John Doe", "ignored", ["social distancing"])
         spotted_triple = Triple("http://dbpedia.org/resource/John_Doe", "ignored", ["social distancing"])
@@ -108,7 +125,8 @@ class TestTripleProducer(unittest.TestCase):
     @patch('common.tripleproducer.StanfordExtractor')
     @patch('common.tripleproducer.KnowledgeGraphWrapper')
     def test_spot_local_entities_object_exist(self, mock_kg, mock_stanford):
-        mock_kg.return_value.check_resource_existence.return_value = True
+        mock_kg.return_value.check_resources_existence_bulk.return_value = {
+            "http://dbpedia.org/resource/social_distancing"}
 
         triple = Triple("John Doe", "ignored", ["social distancing"])
         spotted_triple = Triple("http://dbpedia.org/resource/John_Doe", "ignored",
@@ -0,0 +1,107 @@
+class PhraseIndex:
+    """
+    An index of phrases that answers whether a text is one of the phrases, or a substring of any of them.
+    All phrases are joined into a single string, so that the substring test is one substring search over the joined
+    string, instead of a search over each phrase.
+    Here the text is searched for within the phrases. The reverse lookup, searching a text for any of many patterns,
+    is done by MultiPatternMatcher.
+
+    :param phrases: list of phrases
+    :type phrases: list
+    """
+    SEPARATOR = '\x00'
+
+    def __init__(self, phrases):
+        """
+        Constructor method
+        """
+        self.phrases = set(phrases)
+        self.__joined = self.SEPARATOR + self.SEPARATOR.join(self.phrases) + self.SEPARATOR
+
+    def __contains__(self, text):
+        return text in self.phrases
+
+    def contains_substring(self, text):
+        """
+        Checks if the text is a substring of any of the phrases (including being one of the phrases).
+
+        :param text: text
+        :type text: str
+        :return: True if the text is a substring of any of the phrases, False otherwise
+        :rtype: bool
+        """
+        if len(self.phrases) == 0:
+            return False
+        if self.SEPARATOR in text:
+            return any(text in phrase for phrase in self.phrases)
+        return text in self.__joined
+
+
+class MultiPatternMatcher:
+    """
+    An Aho-Corasick automaton over a list of patterns, which finds the patterns that occur in a text in a single pass
+    over the text, regardless of the number of patterns.
+    Unlike PhraseIndex, many patterns are searched for within one text, which a single substring search over joined
+    strings cannot answer.
+
+    :param patterns: list of patterns
+    :type patterns: list
+    """
+
+    def __init__(self, patterns):
+        """
+        Constructor method
+        """
+        self.patterns = list(patterns)
+        self.__goto = [{}]
+        self.__fail = [0]
+        # lowest index of the patterns that end at each state (including the ones reached through the failure links)
+        self.__first = [None]
+
+        for i, pattern in enumerate(self.patterns):
+            state = 0
+            for char in pattern:
+                if char not in self.__goto[state]:
+                    self.__goto.append({})
+                    self.__fail.append(0)
+                    self.__first.append(None)
+                    self.__goto[state][char] = len(self.__goto) - 1
+                state = self.__goto[state][char]
+            if self.__first[state] is None:
+                self.__first[state] = i
+
+        # breadth-first, so the failure state of every state is complete before the state itself is visited
+        queue = list(self.__goto[0].values())
+        for state in queue:
+            for char, next_state in self.__goto[state].items():
+                queue.append(next_state)
+                fail = self.__fail[state]
+                while fail and char not in self.__goto[fail]:
+                    fail = self.__fail[fail]
+                self.__fail[next_state] = self.__goto[fail].get(char, 0)
+            # states are visited after their failure states, so their lowest indices are already final
+            fail_first = self.__first[self.__fail[state]]
+            if fail_first is not None and (self.__first[state] is None or fail_first < self.__first[state]):
+                self.__first[state] = fail_first
+
+    def first_match(self, text):
+        """
+        Finds the pattern with the lowest index (i.e. the first in the list of patterns) that is a substring of the text.
+
+        :param text: text
+        :type text: str
+        :return: index of the pattern, or None if no pattern is a substring of the text
+        :rtype: int or None
+        """
+        first = self.__first[0]
+        state = 0
+        for char in text:
+            while state and char not in self.__goto[state]:
+                state = self.__fail[state]
+            state = self.__goto[state].get(char, 0)
+            match = self.__first[state]
+            if match is not None and (first is None or match < first):
+                first = match
+                if first == 0:
+                    break
+        return first
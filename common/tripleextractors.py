@@ -4,6 +4,7 @@ import logging.config
 import os
 
 from abc import ABC, abstractmethod
+from bisect import bisect_right
 from json import JSONDecodeError
 from dotenv import load_dotenv
 from pathlib import Path
@@ -37,6 +38,19 @@ class TripleExtractor(ABC):
         """
         pass
 
+    def extract_document(self, sentences):
+        """
+        Extract SPO triples from all sentences of a document.
+        By default, the sentences are extracted one by one. Extractors that can process a whole document at once
+        should override this.
+
+        :param sentences: list of document sentences
+        :type sentences: list
+        :return: a list of list of triples (top-level list represents sentences)
+        :rtype: list
+        """
+        return [self.extract(sentence) for sentence in sentences]
+
 
 class StanfordExtractor(TripleExtractor):
     """
@@ -71,6 +85,39 @@ class StanfordExtractor(TripleExtractor):
                        for output in outputs for openie_triple in output['openie']]
         return all_triples
 
+    def extract_document(self, sentences):
+        """
+        Extract SPO triples from all sentences of a document with a single CoreNLP annotate call.
+        The sentences are joined into one text, and every sentence returned by CoreNLP is mapped back to the sentence
+        it starts in, using its character offset. Therefore, the result always has the same length as the sentences.
+
+        :param sentences: list of document sentences
+        :type sentences: list
+        :return: a list of list of triples (top-level list represents sentences)
+        :rtype: list
+        """
+        all_triples = [[] for _ in sentences]
+        if len(sentences) == 0:
+            return all_triples
+        # CoreNLP offsets count UTF-16 code units, as Java strings do
+        starts = []
+        offset = 0
+        for sentence in sentences:
+            starts.append(offset)
+            offset += len(sentence.encode('utf-16-le')) // 2 + 1
+        try:
+            outputs = json.loads(self.coreNLP.annotate(' '.join(sentences), self.props))['sentences']
+        except JSONDecodeError as e:
+            self.logger.error('Triple extraction error: JSONDecodeError ' + e.__str__())
+            return all_triples
+        for output in outputs:
+            if len(output['tokens']) == 0:
+                continue
+            index = max(bisect_right(starts, output['tokens'][0]['characterOffsetBegin']) - 1, 0)
+            all_triples[index].extend(Triple(openie_triple['subject'], openie_triple['relation'],
+                                             [openie_triple['object']]) for openie_triple in output['openie'])
+        return all_triples
+
 
 class IITExtractor(TripleExtractor):
     """
@@ -1,17 +1,17 @@
 import json
 import logging
 import logging.config
-import neuralcoref
 import os
 import requests
-import spacy
 
-from json import JSONDecodeError
+from concurrent.futures import ThreadPoolExecutor, TimeoutError
 from nltk.tokenize import sent_tokenize, word_tokenize
-from spacy.matcher import Matcher
 
 from definitions import ROOT_DIR, LOGGER_CONFIG_PATH
 from .kgwrapper import KnowledgeGraphWrapper
+from .models import get_nlp, get_stopwords
+from .spotlight import SpotlightClient
+from .textindex import MultiPatternMatcher, PhraseIndex
 from .triple import Triple
 from .tripleextractors import StanfordExtractor, IITExtractor
 from .utils import convert_to_dbpedia_ontology, DBPEDIA_RESOURCE
@@ -28,12 +28,16 @@ class TripleProducer:
     :param extraction_scope: The scope of the extraction, deciding whether it should include only relations between
         'named_entities', 'noun_phrases', or 'all', defaults to 'named entities' for now.
     :type extraction_scope: str
+    :param document_extraction: whether the triples of all sentences of a document are extracted with a single call
+        to the extractor, instead of a call per sentence, defaults to False
+    :type document_extraction: bool
 
     """
-    SPOTLIGHT_URL = 'https://api.dbpedia-spotlight.org/en/annotate?'
     FALCON_URL = 'https://labs.tib.eu/falcon/api?mode=long'
+    EXTRACTION_WORKERS = 4  # number of sentences sent to the triple extractor concurrently
+    EXTRACTION_TIMEOUT = 60  # seconds to wait for the triples of a sentence
 
-    def __init__(self, extractor_type=None, extraction_scope=None):
+    def __init__(self, extractor_type=None, extraction_scope=None, document_extraction=False):
         """
         Constructor method
         """
@@ -49,15 +53,13 @@ class TripleProducer:
         self.extraction_scope = 'named_entities' if extraction_scope is None else extraction_scope
         if self.extraction_scope not in ['named_entities', 'noun_phrases', 'all']:
             raise ValueError("The extraction_scope is unrecognised. Use 'named_entities', 'noun_phrases', or 'all'.")
+        self.document_extraction = document_extraction
 
         # Knowledge graph setup
         self.knowledge_graph = KnowledgeGraphWrapper()
 
-        # Spacy setup
-        self.nlp = spacy.load('en_core_web_sm')
-        neuralcoref.add_to_pipe(self.nlp)
-        self.all_stopwords = self.nlp.Defaults.stop_words
-        self.all_stopwords.discard('not')
+        # DBpedia Spotlight setup
+        self.spotlight = SpotlightClient()
 
         # Logger setup
         LOGFILE_PATH = os.path.join(ROOT_DIR, 'logs', 'triple-producer.log').replace("\\", "/")
@@ -66,7 +68,50 @@ class TripleProducer:
                                   disable_existing_loggers=False)
         self.logger = logging.getLogger()
 
-    def produce_triples(self, document, extraction_scope=None):
+    @property
+    def nlp(self):
+        """
+        The spaCy pipeline (with neuralcoref), shared across the process and loaded on its first use.
+        """
+        return get_nlp()
+
+    @property
+    def all_stopwords(self):
+        """
+        The stop words of the spaCy pipeline, excluding 'not'.
+        """
+        return get_stopwords()
+
+    def parse(self, document):
+        """
+        Parses the document with the spaCy pipeline (including neuralcoref). The parsed document can be passed to
+        produce_triples and EntityCorefResolver.get_coref_clusters, so that the document is only parsed once.
+
+        :param document: raw texts of document
+        :type document: str
+        :return: spacy document
+        :rtype: spacy.tokens.Doc
+        """
+        return self.nlp(document)
+
+    def parse_all(self, documents, batch_size=None):
+        """
+        Parses the documents as a stream with nlp.pipe, which is faster than parsing them one by one.
+        The documents are parsed in a single process, because the neuralcoref extensions of the parsed documents do not
+        survive being pickled between processes.
+
+        :param documents: raw texts of documents
+        :type documents: list
+        :param batch_size: number of documents buffered and parsed together, defaults to spaCy's default
+        :type batch_size: int
+        :return: generator of spacy documents, in the same order as the documents
+        :rtype: generator
+        """
+        if batch_size is None:
+            return self.nlp.pipe(documents)
+        return self.nlp.pipe(documents, batch_size=batch_size)
+
+    def produce_triples(self, document, extraction_scope=None, spacy_doc=None):
         """
         Produce triples extracted from the document that are processed through the pipeline.
         The triples produced are in the form of:
@@ -83,6 +128,8 @@ class TripleProducer:
         :param extraction_scope: The scope of the extraction, deciding whether it should include only relations between
             'named_entities', 'noun_phrases', or 'all. Defaults to the extraction_scope member variable.
         :type extraction_scope: str
+        :param spacy_doc: the document already parsed with parse(), defaults to parsing the document
+        :type spacy_doc: spacy.tokens.Doc
         :return: a list of tuples, of sentence and its triples, as explained
         :rtype: list
         """
@@ -90,7 +137,8 @@ class TripleProducer:
         if extraction_scope not in ['named_entities', 'noun_phrases', 'all']:
             raise ValueError("The extraction_scope is unrecognised. Use 'named_entities', 'noun_phrases', or 'all'.")
 
-        spacy_doc = self.nlp(document)
+        if spacy_doc is None:
+            spacy_doc = self.parse(document)
         original_sentences = sent_tokenize(self.__capitalise_sentence_start(document))
 
         # coreference resolution
@@ -177,20 +225,61 @@ class TripleProducer:
         capitalised = [sentence[0].capitalize() + sentence[1:] for sentence in sentences if len(sentence) > 0]
         return '. '.join(capitalised)
 
-    def extract_triples(self, sentences):
+    def extract_triples(self, sentences, max_workers=None, timeout=None):
         """
         Extract triples from document using the implementation of TripleExtractor.
+        If document_extraction is set, all sentences are extracted with a single call to the extractor.
+        Otherwise, the sentences are extracted concurrently, but the results keep the order of the sentences.
+        If the extraction of a sentence fails or times out, no triples are returned for that sentence.
 
         :param sentences: list of document sentences
         :type sentences: list
+        :param max_workers: number of sentences extracted concurrently, defaults to EXTRACTION_WORKERS
+        :type max_workers: int
+        :param timeout: seconds to wait for the triples of a sentence, defaults to EXTRACTION_TIMEOUT
+        :type timeout: float
         :return: a list of list of raw triples (top-level list represents sentences)
         :rtype: list
         """
+        if self.document_extraction:
+            try:
+                return self.extractor.extract_document(sentences)
+            except Exception as e:
+                self.logger.error('Triple extraction error for document: %s', e)
+                return [[] for _ in sentences]
+
+        max_workers = self.EXTRACTION_WORKERS if max_workers is None else max_workers
+        timeout = self.EXTRACTION_TIMEOUT if timeout is None else timeout
+        executor = ThreadPoolExecutor(max_workers=max_workers)
+        try:
+            futures = [executor.submit(self.extractor.extract, sentence) for sentence in sentences]
+            return [self.__get_extraction_result(future, sentence, timeout)
+                    for future, sentence in zip(futures, sentences)]
+        finally:
+            # don't wait for the extractions that have timed out
+            executor.shutdown(wait=False)
+
+    def __get_extraction_result(self, future, sentence, timeout):
+        """
+        Wait for the triples extracted from a sentence.
+
+        :param future: the extraction task of the sentence
+        :type future: concurrent.futures.Future
+        :param sentence: the sentence
+        :type sentence: str
+        :param timeout: seconds to wait for the triples
+        :type timeout: float
+        :return: list of raw triples, or an empty list if the extraction failed or timed out
+        :rtype: list
+        """
         try:
-            triples = [self.extractor.extract(sentence) for sentence in sentences]
-            return triples
-        except JSONDecodeError as e:
-            self.logger.error('Triple extraction error')
+            return future.result(timeout=timeout)
+        except TimeoutError:
+            future.cancel()
+            self.logger.error('Triple extraction timed out for sentence: %s', sentence)
+        except Exception as e:
+            self.logger.error('Triple extraction error for sentence: %s: %s', sentence, e)
+        return []
 
     def remove_stopwords(self, all_triples):
         """
@@ -202,7 +291,7 @@ class TripleProducer:
         :return: a list of list of triples in which stopwords have been removed from the Subjects and Objects
         :rtype: list
         """
-        all_stopwords = self.nlp.Defaults.stop_words
+        all_stopwords = self.all_stopwords
         for sentence in all_triples:
             for triple in sentence:
                 triple.subject = ' '.join([word for word in word_tokenize(triple.subject) if word not in all_stopwords])
@@ -222,7 +311,7 @@ class TripleProducer:
         :return: a list of list of triples in which the Subjects and Objects are all named entities
         :rtype: list
         """
-        entities = [ent.text.lower() for ent in spacy_doc.ents]
+        entities = PhraseIndex([ent.text.lower() for ent in spacy_doc.ents])
         return self.__filter(entities, all_triples)
 
     # spacy noun chunks is not accurate
@@ -238,7 +327,7 @@ class TripleProducer:
         :return: a list of list of triples in which the Subjects and Objects are all noun phrases
         :rtype: list
         """
-        noun_phrases = [chunk.text.lower() for chunk in spacy_doc.noun_chunks]
+        noun_phrases = PhraseIndex([chunk.text.lower() for chunk in spacy_doc.noun_chunks])
         return self.__filter(noun_phrases, all_triples)
 
     def filter_noun_phrases(self, all_triples):
@@ -274,10 +363,11 @@ class TripleProducer:
 
     def __filter(self, in_list, all_triples):
         """
-        Filter in only triples where the Subject and Object are in the in_list argument.
+        Filter in only triples where the Subject and Object are in the in_list argument, or are a substring of one of
+        its phrases.
 
-        :param in_list: list of acceptable Subjects and Objects
-        :type in_list: list
+        :param in_list: index of acceptable Subjects and Objects
+        :type in_list: textindex.PhraseIndex
         :param all_triples: a list of list of triples (top-level list represents sentences)
         :type all_triples: list
         :return: a list of list of triples in which the Subjects and Objects are all in the in_list argument
@@ -287,10 +377,10 @@ class TripleProducer:
         for sentence in all_triples:
             filtered_triples = []
             for triple in sentence:
-                if triple.subject.lower() in in_list or any(triple.subject.lower() in token for token in in_list):
+                if in_list.contains_substring(triple.subject.lower()):
                     # if any(triple.subject in word or word in triple.subject for word in in_list):
                     for obj in triple.objects:
-                        if obj.lower() in in_list or any(obj.lower() in token for token in in_list):
+                        if in_list.contains_substring(obj.lower()):
                             # if any(obj in word or word in obj for word in in_list):
                             filtered_triples.append(triple)
                             break
@@ -329,19 +419,7 @@ class TripleProducer:
             if possible
         :rtype: list
         """
-        # Do we need to split the sentences first or not? May help with context if not?
-        # sentences = sent_tokenize(document)
-        response = requests.get(self.SPOTLIGHT_URL,
-                                params={'text': document},
-                                headers={'Accept': 'application/json'})
-        if response.status_code != 200:
-            self.logger.error(response.text)
-        try:
-            response = response.json()
-        except json.decoder.JSONDecodeError as e:
-            self.logger.error(e.msg)
-            response = None
-
+        response = self.spotlight.annotate_document(document)
         if response is None:
             return all_triples
         resources = response['Resources'] if 'Resources' in response else None
@@ -349,13 +427,16 @@ class TripleProducer:
             return all_triples
 
         entities = {resource['@surfaceForm']: resource['@URI'] for resource in resources}
+        surface_forms = MultiPatternMatcher(entities.keys())
+        uris = list(entities.values())
         for sentence in all_triples:
             for triple in sentence:
                 if entities.get(triple.subject):
                     triple.subject = entities.get(triple.subject)
                 else:
-                    triple.subject = self.__find_uri(triple.subject, entities)
-                triple.objects = [entities.get(obj, self.__find_uri(obj, entities)) for obj in triple.objects]
+                    triple.subject = self.__find_uri(triple.subject, surface_forms, uris)
+                triple.objects = [entities[obj] if obj in entities else self.__find_uri(obj, surface_forms, uris)
+                                  for obj in triple.objects]
 
         return all_triples
 
@@ -371,32 +452,38 @@ class TripleProducer:
             and objects that exist in the local KG also converted to dbpedia resources
         :rtype: list
         """
+        # the existence of all candidate objects of the document is checked at once
+        candidates = [DBPEDIA_RESOURCE + obj.replace(" ", "_") for sentence in all_triples for triple in sentence
+                      for obj in triple.objects if obj and not obj.startswith(DBPEDIA_RESOURCE)]
+        existing = self.knowledge_graph.check_resources_existence_bulk(candidates) if len(candidates) > 0 else set()
         for sentence in all_triples:
             for triple in sentence:
                 # subject needs to be resource, regardless of its existence
                 if not triple.subject.startswith(DBPEDIA_RESOURCE):
                     triple.subject = DBPEDIA_RESOURCE + triple.subject.replace(" ", "_")
                 triple.objects = [DBPEDIA_RESOURCE + obj.replace(" ", "_") if obj and not obj.startswith(DBPEDIA_RESOURCE) and
-                                  self.knowledge_graph.check_resource_existence(DBPEDIA_RESOURCE + obj.replace(" ", "_"))
+                                  DBPEDIA_RESOURCE + obj.replace(" ", "_") in existing
                                   else obj for obj in triple.objects]
         return all_triples
 
-    def __find_uri(self, obj, entities):
+    def __find_uri(self, obj, surface_forms, uris):
         """
         Find DBpedia resource for a given subject/object where the DBpedia resource is a substring of the subject/object.
         If such resource does not exist, return the original subject/object.
 
         :param obj: subject/object
         :type obj: str
-        :param entities: a dictionary of entities as keys and their DBpedia URI as items
-        :type entities: dict
+        :param surface_forms: a matcher of the surface forms of the entities
+        :type surface_forms: textindex.MultiPatternMatcher
+        :param uris: DBpedia URIs of the entities, in the same order as the surface forms
+        :type uris: list
         :return: the DBpedia resource if exist, otherwise, return the original subject/object
         :rtype: str
         """
-        candidates = [uri for surfaceForm, uri in entities.items() if surfaceForm in obj]
-        if len(candidates) > 0:
-            # Only getting index [0] might be unacceptable if there are multiple candidates
-            return candidates[0]
+        candidate = surface_forms.first_match(obj)
+        if candidate is not None:
+            # Only getting the first candidate might be unacceptable if there are multiple candidates
+            return uris[candidate]
         return obj
 
     def link_relations(self, sentences, all_triples):
@@ -463,6 +550,7 @@ class TripleProducer:
         :return: list of list of triples where relations have been lemmatised
         :rtype: list
         """
+        lemma_index = self.__build_lemma_index(spacy_doc)
         for sentence in all_triples:
             for triple in sentence:
                 if triple.relation == 'is in':
@@ -471,28 +559,38 @@ class TripleProducer:
                     relation = [word for word in word_tokenize(triple.relation.replace('[', '').replace(']', ''))]
                     if len(relation) > 1:
                         relation = [word for word in relation if word not in self.all_stopwords]
-                    triple.relation = ' '.join([self.__get_lemma(token, spacy_doc) for token in relation])
+                    triple.relation = ' '.join([self.__get_lemma(token, lemma_index) for token in relation])
                     if not triple.relation or triple.relation == 'be':
                         triple.relation = 'is'
         return all_triples
 
-    def __get_lemma(self, token, spacy_doc):
+    def __build_lemma_index(self, spacy_doc):
         """
-        Find the lemma based on the token's appearance in the text.
+        Build an index of the lemmas of the tokens in the text, where each token text is mapped to the lemma of its
+        first appearance in the text.
 
-        :param token: the token whose lemma is to be found
-        :type token: str
         :param spacy_doc: spacy document of the text
         :type spacy_doc: spacy.tokens.Doc
-        :return: lemma of the token
+        :return: dictionary of token texts as keys and their lemmas as items
+        :rtype: dict
+        """
+        lemma_index = {}
+        for token in spacy_doc:
+            lemma_index.setdefault(token.text, token.lemma_)
+        return lemma_index
+
+    def __get_lemma(self, token, lemma_index):
+        """
+        Find the lemma based on the token's first appearance in the text.
+
+        :param token: the token whose lemma is to be found
+        :type token: str
+        :param lemma_index: index of the lemmas of the text, built by __build_lemma_index
+        :type lemma_index: dict
+        :return: lemma of the token, or an empty string if the token doesn't appear in the text
         :rtype: str
         """
-        matcher = Matcher(self.nlp.vocab)
-        matcher.add(token, None, [{"TEXT": token}])
-        if len(matcher(spacy_doc)) == 0:
-            return ''
-        match = (matcher(spacy_doc)[0])
-        return spacy_doc[match[1]:match[2]].lemma_
+        return lemma_index.get(token, '')
 
     def convert_relations(self, all_triples):
         """
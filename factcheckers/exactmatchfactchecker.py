@@ -19,7 +19,9 @@ class ExactMatchFactChecker(FactChecker):
         :rtype: list
         """
         article_triples = self.triple_producer.produce_triples(article, extraction_scope)
-        fc_result = [(sentence, {triple: self.exact_fact_check(triple)
+        exists = iter(self.knowledge_graph.check_triples_existence_bulk(
+            [triple for (sentence, triples) in article_triples for triple in triples]))
+        fc_result = [(sentence, {triple: self.exact_fact_check(triple, exists=next(exists))
                       for triple in triples}) for (sentence, triples) in article_triples]
         # truth_values = [val for sentence, triples in fc_result for val in triples.values()]
         # truthfulness = sum(truth_values) / len(truth_values) if len(fc_result) > 0 else 0
@@ -36,12 +38,14 @@ class ExactMatchFactChecker(FactChecker):
         :return: a list of fact check result (sentence, {triples: their results})
         :rtype: tuple
         """
-        fc_result = {triple: self.exact_fact_check(triple, transitive) for triple in triples}
+        exists = self.knowledge_graph.check_triples_existence_bulk(triples, transitive)
+        fc_result = {triple: self.exact_fact_check(triple, transitive, triple_exists)
+                     for triple, triple_exists in zip(triples, exists)}
         # truthfulness = sum(fc_result.values()) / len(fc_result) if len(fc_result) > 0 else 0
         # what to return here?
         return fc_result
 
-    def exact_fact_check(self, triple, transitive=False):
+    def exact_fact_check(self, triple, transitive=False, exists=None):
         """
         Checks for the triple existence and conflicts
 
@@ -49,10 +53,14 @@ class ExactMatchFactChecker(FactChecker):
         :type triple: triple.Triple
         :param transitive: whether a check should also be done for entities that are in the sameAs relation with the subject
         :type transitive: bool
+        :param exists: the existence of the triple, if it has already been checked (e.g. in bulk). If None, the
+            existence is checked against the knowledge graph.
+        :type exists: bool
         :return: a tuple of its result and list of supporting triples
         :rtype: tuple
         """
-        exists = self.knowledge_graph.check_triple_object_existence(triple, transitive)
+        if exists is None:
+            exists = self.knowledge_graph.check_triple_object_existence(triple, transitive)
         if exists is True:
             return 'exists', []
         conflicts = self.knowledge_graph.get_triples(triple.subject, triple.relation, transitive)
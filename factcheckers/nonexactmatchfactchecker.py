@@ -35,8 +35,10 @@ class NonExactMatchFactChecker(FactChecker):
         :return: a list of fact check result (sentence, {triples: their results})
         :rtype: list
         """
-        article_triples = self.triple_producer.produce_triples(article, extraction_scope)
-        entity_clusters = self.coref_resolver.get_coref_clusters(article)
+        # the article is parsed once, for both the triple production and the coreference clusters
+        spacy_doc = self.triple_producer.parse(article)
+        article_triples = self.triple_producer.produce_triples(article, extraction_scope, spacy_doc=spacy_doc)
+        entity_clusters = self.coref_resolver.get_coref_clusters(spacy_doc)
         # fc_result = [(sentence, {result[0]: result[1] for result in self.non_exact_fact_check(triple, entity_clusters)})
         #              for (sentence, triples) in article_triples for triple in triples]
         fc_result = [(sentence, {triple: self.non_exact_fact_check(triple, entity_clusters)
@@ -0,0 +1,180 @@
+import logging
+import queue
+import threading
+import time
+
+from pymongo.errors import OperationFailure, PyMongoError
+
+
+class ArticleWatcher:
+    """
+    Watches the articles collection for new articles whose triples have not been extracted yet, and queues their URLs.
+    It reacts to inserts through a MongoDB change stream. If change streams are not supported (i.e. MongoDB is not a
+    replica set), it falls back to polling, with the polling interval backing off exponentially while no article is
+    found.
+    Every sweep_interval, all pending articles are queued again, so that the articles whose extraction has failed are
+    retried, as change streams and polling only report new articles.
+
+    :param collection: the articles collection
+    :type collection: pymongo.collection.Collection
+    :param min_poll_interval: polling interval in seconds after an article is found, defaults to MIN_POLL_INTERVAL
+    :type min_poll_interval: float
+    :param max_poll_interval: maximum polling interval in seconds, defaults to MAX_POLL_INTERVAL
+    :type max_poll_interval: float
+    :param use_change_stream: whether a change stream is tried before polling, defaults to True
+    :type use_change_stream: bool
+    :param sweep_interval: seconds between the sweeps of all pending articles, defaults to SWEEP_INTERVAL
+    :type sweep_interval: float
+    """
+    MIN_POLL_INTERVAL = 1
+    MAX_POLL_INTERVAL = 60
+    SWEEP_INTERVAL = 300
+
+    def __init__(self, collection, min_poll_interval=None, max_poll_interval=None, use_change_stream=True,
+                 sweep_interval=None):
+        """
+        Constructor method
+        """
+        self.collection = collection
+        self.min_poll_interval = self.MIN_POLL_INTERVAL if min_poll_interval is None else min_poll_interval
+        self.max_poll_interval = self.MAX_POLL_INTERVAL if max_poll_interval is None else max_poll_interval
+        self.use_change_stream = use_change_stream
+        self.sweep_interval = self.SWEEP_INTERVAL if sweep_interval is None else sweep_interval
+        self.poll_interval = self.min_poll_interval
+        self.logger = logging.getLogger()
+        self.__queue = queue.Queue()
+        self.__queued = set()
+        self.__lock = threading.Lock()
+        self.__last_id = None
+        self.__last_sweep = None
+        self.__stop = threading.Event()
+        self.__thread = None
+
+    @property
+    def queue_depth(self):
+        """
+        The number of queued articles that have not been taken from the queue yet.
+        """
+        return self.__queue.qsize()
+
+    def start(self):
+        """
+        Starts watching for new articles in a background thread. The articles that are already pending are queued first.
+        """
+        self.__stop.clear()
+        self.__thread = threading.Thread(target=self.__run, daemon=True)
+        self.__thread.start()
+
+    def stop(self):
+        """
+        Stops watching for new articles.
+        """
+        self.__stop.set()
+
+    def get(self, timeout=None):
+        """
+        Takes the URL of the next queued article, waiting for one to be queued if there is none.
+
+        :param timeout: maximum number of seconds to wait, defaults to waiting forever
+        :type timeout: float
+        :return: URL of the article, or None if the timeout has passed
+        :rtype: str or None
+        """
+        try:
+            source = self.__queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+        with self.__lock:
+            self.__queued.discard(source)
+        return source
+
+    def __enqueue(self, source):
+        """
+        Queues the URL of an article, unless it is already queued.
+
+        :param source: URL of the article
+        :type source: str
+        """
+        with self.__lock:
+            if source in self.__queued:
+                return
+            self.__queued.add(source)
+        self.__queue.put(source)
+        self.logger.info('Queued article %s (queue depth: %d)', source, self.queue_depth)
+
+    def __run(self):
+        """
+        Private method that watches the articles with a change stream, or polls them if change streams are not
+        supported.
+        """
+        if self.use_change_stream:
+            try:
+                self.__watch()
+                return
+            except OperationFailure as e:
+                self.logger.warning('Change streams are not supported, falling back to polling: %s', e)
+            except PyMongoError as e:
+                self.logger.error('Change stream failed, falling back to polling: %s', e)
+        while not self.__stop.is_set():
+            try:
+                self.__sweep_if_due()
+                found = self.poll()
+            except PyMongoError as e:
+                self.logger.error('Polling articles failed: %s', e)
+                found = 0
+            if found > 0:
+                self.poll_interval = self.min_poll_interval
+            else:
+                self.poll_interval = min(self.poll_interval * 2, self.max_poll_interval)
+            self.__stop.wait(self.poll_interval)
+
+    def __watch(self):
+        """
+        Private method that queues the pending articles, and then the articles inserted afterwards, as they are inserted.
+        The change stream is opened before the pending articles are queued, so that no insert is missed in between.
+        """
+        pipeline = [{'$match': {'operationType': 'insert', 'fullDocument.extracted': False}}]
+        with self.collection.watch(pipeline, max_await_time_ms=1000) as stream:
+            self.sweep()
+            while not self.__stop.is_set():
+                self.__sweep_if_due()
+                change = stream.try_next()
+                if change is not None:
+                    self.__enqueue(change['fullDocument']['source'])
+
+    def sweep(self):
+        """
+        Queues all pending articles that are not queued, including the ones that have been taken from the queue but
+        have failed to be extracted.
+
+        :return: number of pending articles found
+        :rtype: int
+        """
+        self.__last_sweep = time.monotonic()
+        self.__last_id = None
+        return self.poll()
+
+    def __sweep_if_due(self):
+        """
+        Private method that sweeps the pending articles if sweep_interval has passed since the last sweep.
+        """
+        if self.__last_sweep is None or time.monotonic() - self.__last_sweep >= self.sweep_interval:
+            found = self.sweep()
+            self.logger.info('Swept %d pending articles (queue depth: %d)', found, self.queue_depth)
+
+    def poll(self):
+        """
+        Queues the pending articles that have been inserted since the last poll.
+
+        :return: number of articles found
+        :rtype: int
+        """
+        query = {'extracted': False}
+        if self.__last_id is not None:
+            query['_id'] = {'$gt': self.__last_id}
+        found = 0
+        for article in self.collection.find(query, {'source': 1}).sort('_id', 1):
+            self.__last_id = article['_id']
+            self.__enqueue(article['source'])
+            found += 1
+        return found
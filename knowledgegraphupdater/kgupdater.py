@@ -1,10 +1,18 @@
+import hashlib
+import json
 import logging
 import logging.config
 import os
+import threading
 
+from datetime import datetime, timedelta
 from dotenv import load_dotenv
+from itertools import groupby, islice
 from pathlib import Path
-from pymongo import MongoClient
+from pymongo import DeleteMany, MongoClient, ReplaceOne, ReturnDocument, UpdateMany, UpdateOne
+
+from bson import ObjectId
+from bson.errors import InvalidId
 
 from articlescraper.scrapers import Scrapers
 from definitions import ROOT_DIR, LOGGER_CONFIG_PATH
@@ -22,6 +30,13 @@ class KnowledgeGraphUpdater:
         or wait for user confirmation
     :type auto_update: bool
     """
+    UPDATE_BATCH_SIZE = 50  # number of articles processed together by update_missed_knowledge
+    LEASE_DURATION = 300  # seconds an article claimed by a worker is leased for, unless it is renewed
+    PAGE_SIZE = 100  # number of articles returned by a page, unless another limit is given
+    MAX_PAGE_SIZE = 1000  # maximum number of articles returned by a page
+    # indexes of the articles collection that are no longer used, dropped by migrate
+    LEGACY_INDEXES = ['triples.triples.subject_1_triples.triples.relation_1', 'coref_entities.main_1',
+                      'extracted_1_date_-1']
 
     def __init__(self, auto_update=None):
         LOGFILE_PATH = os.path.join(ROOT_DIR, 'logs', 'kg-updater.log').replace("\\", "/")
@@ -36,8 +51,11 @@ class KnowledgeGraphUpdater:
         self.db_article_collection = self.db['articles']
         self.db_article_collection.create_index('source', unique=True)
         self.db_triples_collection = self.db['triples']
+        self.db_article_triples_collection = self.db['article_triples']
+        self.__ensure_indexes()
 
-        self.triple_producer = TripleProducer(extractor_type='stanford_openie', extraction_scope='noun_phrases')
+        self.triple_producer = TripleProducer(extractor_type='stanford_openie', extraction_scope='noun_phrases',
+                                              document_extraction=True)
         self.knowledge_graph = KnowledgeGraphWrapper()
         if auto_update is None:
             self.auto_update = False
@@ -47,10 +65,311 @@ class KnowledgeGraphUpdater:
 
         self.scrapers = Scrapers()
 
-    def update_missed_knowledge(self, kg_auto_update=None, extraction_scope=None):
+    def __ensure_indexes(self):
+        """
+        Private method to create the indexes of the articles and article_triples collections, if they do not exist.
+        Whether the triples of an article have been extracted is kept in the 'extracted' field, because partial indexes
+        cannot filter on the missing 'triples' field.
+        """
+        # pending and extracted articles, in insertion order, which is the order of their pages
+        self.db_article_collection.create_index([('extracted', 1), ('_id', 1)], name='articles_by_extracted')
+        # leases of the pending articles
+        self.db_article_collection.create_index([('extracted', 1), ('lease_expires', 1)], name='pending_articles_lease',
+                                                partialFilterExpression={'extracted': False})
+        # articles with unresolved corefering entities
+        self.db_article_collection.create_index('coref_entities.mentions.resolved', name='unresolved_coref_entities',
+                                                partialFilterExpression={'coref_entities.mentions.resolved': False})
+        self.db_triples_collection.create_index([('subject', 1), ('relation', 1)])
+        # one document per (article, sentence, triple)
+        self.db_article_triples_collection.create_index([('source', 1), ('sentence_index', 1), ('triple_key', 1)],
+                                                        unique=True)
+        self.db_article_triples_collection.create_index('triple_key')
+        self.db_article_triples_collection.create_index([('subject', 1), ('relation', 1)])
+        # articles with pending triples, in the order of their source
+        self.db_article_triples_collection.create_index([('added', 1), ('source', 1)], name='pending_article_triples',
+                                                        partialFilterExpression={'added': False})
+
+    def migrate(self):
+        """
+        Migrates the articles that have been stored in an older format: sets the 'extracted' field of the articles
+        without it, and moves the triples that are still nested in the articles (as
+        triples: [{sentence, triples: [{subject, relation, objects, added}]}]) to the article_triples collection.
+        The indexes that were only used by the older format are dropped.
+        This is a one-off operation, which must be run once before the updater is started on an older database (with
+        'python -m knowledgegraphupdater.kgupdaterrunner --migrate'), and not while any updater is running.
+
+        :return: number of articles whose nested triples have been moved
+        :rtype: int
+        """
+        self.db_article_collection.update_many({'extracted': {'$exists': False}, 'triples': None},
+                                               {'$set': {'extracted': False}})
+        self.db_article_collection.update_many({'extracted': {'$exists': False}}, {'$set': {'extracted': True}})
+        migrated = 0
+        for article in self.db_article_collection.find({'triples': {'$exists': True}}, {'source': 1, 'triples': 1}):
+            if article['triples'] is not None:
+                self.__save_article_triples(article['source'], article['triples'])
+                migrated += 1
+            self.db_article_collection.update_one({'_id': article['_id']}, {'$unset': {'triples': ''}})
+        indexes = self.db_article_collection.index_information()
+        for index in self.LEGACY_INDEXES:
+            if index in indexes:
+                self.db_article_collection.drop_index(index)
+        self.logger.info('Migrated the triples of %d articles', migrated)
+        return migrated
+
+    @staticmethod
+    def __triple_key(triple):
+        """
+        Private method that returns the key of a triple, which identifies the triple in the article_triples collection.
+
+        :param triple: triple (in the form of dictionary)
+        :type triple: dict
+        :return: hash of the Subject, Relation, and Objects of the triple
+        :rtype: str
+        """
+        return hashlib.sha1(json.dumps([triple['subject'], triple['relation'], triple['objects']])
+                            .encode('utf-8')).hexdigest()
+
+    def __article_triple_operations(self, article_url, triples):
+        """
+        Private method that returns the bulk write operations that upsert the triples of an article.
+
+        :param article_url: URL of the article source
+        :type article_url: str
+        :param triples: list of sentences and their triples, as returned by get_article_knowledge
+        :type triples: list
+        :return: list of bulk write operations for the article_triples collection
+        :rtype: list
+        """
+        operations = []
+        for sentence_index, sentence in enumerate(triples):
+            for triple in sentence['triples']:
+                key = {'source': article_url, 'sentence_index': sentence_index, 'triple_key': self.__triple_key(triple)}
+                operations.append(UpdateOne(key, {'$set': {**key, 'sentence': sentence['sentence'],
+                                                           'subject': triple['subject'],
+                                                           'relation': triple['relation'],
+                                                           'objects': triple['objects'],
+                                                           'added': triple['added']}}, upsert=True))
+        return operations
+
+    def __save_article_triples(self, article_url, triples):
+        """
+        Private method to replace the stored triples of an article.
+        The triples are upserted with an unordered bulk write, so that a failed triple does not stop the others, and an
+        exception is raised if any of them fails.
+
+        :param article_url: URL of the article source
+        :type article_url: str
+        :param triples: list of sentences and their triples, as returned by get_article_knowledge
+        :type triples: list
+        """
+        self.db_article_triples_collection.delete_many({'source': article_url})
+        operations = self.__article_triple_operations(article_url, triples)
+        if len(operations) > 0:
+            self.db_article_triples_collection.bulk_write(operations, ordered=False)
+
+    @staticmethod
+    def __group_article_triples(documents):
+        """
+        Private method that groups the article_triples documents of an article by sentence, in the format of
+        [{sentence, triples: [{subject, relation, objects, added}]}].
+
+        :param documents: article_triples documents of an article, sorted by sentence_index
+        :type documents: iterable
+        :return: list of sentences and their triples
+        :rtype: list
+        """
+        sentences = []
+        manual_sentence = None
+        current_index = object()
+        for document in documents:
+            if document['sentence_index'] is None:
+                # triples about the article that are manually inserted, which come after the extracted sentences
+                if manual_sentence is None:
+                    manual_sentence = {'sentence': '', 'triples': []}
+                sentence = manual_sentence
+            else:
+                if len(sentences) == 0 or document['sentence_index'] != current_index:
+                    current_index = document['sentence_index']
+                    sentences.append({'sentence': document['sentence'], 'triples': []})
+                sentence = sentences[-1]
+            sentence['triples'].append({'subject': document['subject'], 'relation': document['relation'],
+                                        'objects': document['objects'], 'added': document['added']})
+        if manual_sentence is not None:
+            sentences.append(manual_sentence)
+        return sentences
+
+    def __find_article_triples(self, query):
+        """
+        Private method that finds article_triples documents, sorted by article, sentence, and insertion order.
+
+        :param query: query on the article_triples collection
+        :type query: dict
+        :return: cursor of article_triples documents
+        :rtype: pymongo.cursor.Cursor
+        """
+        return self.db_article_triples_collection.find(
+            query, {'source': 1, 'sentence_index': 1, 'sentence': 1, 'subject': 1, 'relation': 1, 'objects': 1,
+                    'added': 1}).sort([('source', 1), ('sentence_index', 1), ('_id', 1)])
+
+    def __aggregate_pending_triples(self, query):
+        """
+        Private method that groups the pending article_triples documents (that have not been added to the knowledge
+        graph) by article and sentence with an aggregation pipeline, so that only pending triples are returned by the db.
+        Sentences and articles without any pending triple are left out.
+
+        :param query: query on the article_triples collection
+        :type query: dict
+        :return: cursor of {_id: source, triples: [{sentence, triples: [{subject, relation, objects, added}]}]},
+            sorted by source
+        :rtype: pymongo.command_cursor.CommandCursor
+        """
+        return self.db_article_triples_collection.aggregate([
+            {'$match': {**query, 'added': False}},
+            # triples about the article that are manually inserted come after the extracted sentences
+            {'$addFields': {'manual': {'$eq': [{'$ifNull': ['$sentence_index', None]}, None]}}},
+            {'$sort': {'source': 1, 'manual': 1, 'sentence_index': 1, '_id': 1}},
+            {'$group': {'_id': {'source': '$source', 'sentence_index': '$sentence_index'},
+                        'manual': {'$first': '$manual'},
+                        'sentence': {'$first': '$sentence'},
+                        'triples': {'$push': {'subject': '$subject', 'relation': '$relation', 'objects': '$objects',
+                                              'added': '$added'}}}},
+            {'$sort': {'_id.source': 1, 'manual': 1, '_id.sentence_index': 1}},
+            {'$group': {'_id': '$_id.source',
+                        'triples': {'$push': {'sentence': '$sentence', 'triples': '$triples'}}}},
+            {'$sort': {'_id': 1}}
+        ])
+
+    def __page_limit(self, limit):
+        """
+        Private method that returns the number of articles of a page.
+
+        :param limit: requested maximum number of articles in the page, or None for PAGE_SIZE
+        :type limit: int
+        :return: the limit, capped at MAX_PAGE_SIZE
+        :rtype: int
+        :raises ValueError: if the limit is less than 1
+        """
+        limit = self.PAGE_SIZE if limit is None else limit
+        if limit < 1:
+            raise ValueError('Limit must be at least 1')
+        return min(limit, self.MAX_PAGE_SIZE)
+
+    def __find_articles_page(self, query, projection, cursor=None, limit=None):
+        """
+        Private method that finds a page of articles, sorted by _id. The next page starts after the _id given by the
+        cursor, so that a page is found by an index range scan regardless of how many pages come before it.
+
+        :param query: query on the articles collection
+        :type query: dict
+        :param projection: fields of the articles to be returned
+        :type projection: dict
+        :param cursor: cursor returned with the previous page, or None for the first page
+        :type cursor: str
+        :param limit: maximum number of articles in the page, defaults to PAGE_SIZE and is capped at MAX_PAGE_SIZE
+        :type limit: int
+        :return: tuple of the articles of the page, and the cursor of the next page (None if it is the last page)
+        :rtype: tuple
+        :raises ValueError: if the cursor or the limit is invalid
+        """
+        limit = self.__page_limit(limit)
+        if cursor is not None:
+            try:
+                query = {**query, '_id': {'$gt': ObjectId(cursor)}}
+            except (InvalidId, TypeError):
+                raise ValueError('Invalid cursor: ' + str(cursor))
+        # one more article is fetched to know whether there is a next page
+        articles = list(self.db_article_collection.find(query, {**projection, '_id': 1}).sort('_id', 1)
+                        .limit(limit + 1))
+        next_cursor = str(articles[limit - 1]['_id']) if len(articles) > limit else None
+        return articles[:limit], next_cursor
+
+    def __iterate_pages(self, find_page, cursor=None):
+        """
+        Private method that iterates over the items of all pages, from the page of the cursor to the last one.
+        Only one page of MAX_PAGE_SIZE articles is held in memory at a time. The first page is found before the
+        generator is returned, so that an invalid cursor is reported before any item is consumed.
+
+        :param find_page: function that returns a page, given a cursor and a limit
+        :type find_page: function
+        :param cursor: cursor of the first page, or None to start from the beginning
+        :type cursor: str
+        :return: generator of the items of all pages
+        :rtype: generator
+        :raises ValueError: if the cursor is invalid
+        """
+        def iterate(items, next_cursor):
+            while True:
+                yield from items
+                if next_cursor is None:
+                    return
+                items, next_cursor = find_page(next_cursor, self.MAX_PAGE_SIZE)
+
+        return iterate(*find_page(cursor, self.MAX_PAGE_SIZE))
+
+    def __find_articles_triples_page(self, cursor=None, limit=None):
+        """
+        Private method that finds a page of extracted articles, and groups the triples of each article of the page.
+
+        :param cursor: cursor returned with the previous page, or None for the first page
+        :type cursor: str
+        :param limit: maximum number of articles in the page
+        :type limit: int
+        :return: tuple of the list of sources and their grouped triples, and the cursor of the next page
+        :rtype: tuple
+        :raises ValueError: if the cursor or the limit is invalid
+        """
+        articles, next_cursor = self.__find_articles_page({'extracted': True}, {'source': 1}, cursor, limit)
+        query = {'source': {'$in': [article['source'] for article in articles]}}
+        triples = {source: self.__group_article_triples(documents)
+                   for source, documents in groupby(self.__find_article_triples(query),
+                                                    key=lambda document: document['source'])}
+        return [{'source': article['source'], 'triples': triples.get(article['source'], [])}
+                for article in articles], next_cursor
+
+    def __find_pending_triples_page(self, cursor=None, limit=None):
+        """
+        Private method that finds a page of the articles with pending triples (that have not been added to the
+        knowledge graph), sorted by source, and groups the pending triples of each article of the page.
+        The page is read from the pending article_triples documents, starting after the source given by the cursor, so
+        that only the pending triples of the articles of the page are read, regardless of how many articles have no
+        pending triple.
+
+        :param cursor: cursor returned with the previous page (the source of its last article), or None for the first
+            page
+        :type cursor: str
+        :param limit: maximum number of articles in the page, defaults to PAGE_SIZE and is capped at MAX_PAGE_SIZE
+        :type limit: int
+        :return: tuple of the list of sources and their grouped pending triples, and the cursor of the next page (None
+            if it is the last page)
+        :rtype: tuple
+        :raises ValueError: if the limit is invalid
+        """
+        limit = self.__page_limit(limit)
+        sources = []
+        # one more article is found to know whether there is a next page, each with a seek on the pending index
+        while len(sources) <= limit:
+            query = {'added': False}
+            if len(sources) > 0 or cursor is not None:
+                query['source'] = {'$gt': sources[-1] if len(sources) > 0 else cursor}
+            document = self.db_article_triples_collection.find_one(query, {'_id': 0, 'source': 1},
+                                                                   sort=[('source', 1)])
+            if document is None:
+                break
+            sources.append(document['source'])
+        next_cursor = sources[limit - 1] if len(sources) > limit else None
+        sources = sources[:limit]
+        if len(sources) == 0:
+            return [], None
+        return [{'source': article['_id'], 'triples': article['triples']}
+                for article in self.__aggregate_pending_triples({'source': {'$in': sources}})], next_cursor
+
+    def update_missed_knowledge(self, kg_auto_update=None, extraction_scope=None, batch_size=None):
         """
         Extract triples from stored articles whose triples has not been extracted yet, and save the triples to the DB.
         If the auto_update mode is active, the non-conflicting triples are added automatically to the knowledge graph.
+        The articles are processed in batches: the articles of a batch are parsed together with nlp.pipe, the existence
+        of all their triples is checked at once, and their triples are saved with one bulk write.
 
         :param kg_auto_update: an optional parameter that sets whether the non-conflicting triples are added to the
             knowledge graph or not. This will only matter if the auto_update field is False. If the auto_update field is
@@ -59,18 +378,143 @@ class KnowledgeGraphUpdater:
         :param extraction_scope: The scope of the extraction, deciding whether it should include only relations between
             'named_entities', 'noun_phrases', or 'all.
         :type extraction_scope: str
+        :param batch_size: number of articles processed in a batch, defaults to UPDATE_BATCH_SIZE
+        :type batch_size: int
+        :return: number of articles whose triples have been extracted and saved, which is 0 if there is no article left
+            or if all remaining articles fail
+        :rtype: int
         """
-        for article in self.db_article_collection.find({'triples': None}):
+        batch_size = self.UPDATE_BATCH_SIZE if batch_size is None else batch_size
+        cursor = self.db_article_collection.find({'extracted': False}, {'source': 1, 'texts': 1}, batch_size=batch_size)
+        extracted = 0
+        while True:
+            articles = list(islice(cursor, batch_size))
+            if len(articles) == 0:
+                return extracted
             try:
-                self.__extract_and_save_triples(article['source'], article['texts'], extraction_scope, kg_auto_update)
+                extracted += self.__extract_and_save_triples_batch(articles, extraction_scope, kg_auto_update)
+            except Exception as e:
+                self.logger.error("Exception occurred when extracting a batch of %d articles: %s", len(articles),
+                                  e.__str__())
+
+    def update_article_knowledge(self, article_url, kg_auto_update=None, extraction_scope=None):
+        """
+        Extract triples from a stored article, if its triples has not been extracted yet, and save the triples to the DB.
+        If the auto_update mode is active, the non-conflicting triples are added automatically to the knowledge graph.
+
+        :param article_url: URL of the article source
+        :type article_url: str
+        :param kg_auto_update: whether the non-conflicting triples are added to the knowledge graph or not.
+        :type kg_auto_update: bool
+        :param extraction_scope: The scope of the extraction, deciding whether it should include only relations between
+            'named_entities', 'noun_phrases', or 'all.
+        :type extraction_scope: str
+        :return: True if the triples of the article have been extracted, False if the article does not exist, has
+            already been extracted, or failed to be extracted
+        :rtype: bool
+        """
+        article = self.db_article_collection.find_one({'source': article_url, 'extracted': False}, {'texts': 1})
+        if article is None:
+            return False
+        try:
+            self.__extract_and_save_triples(article_url, article['texts'], extraction_scope, kg_auto_update)
+            return True
+        except Exception as e:
+            self.logger.error("Exception occurred when extracting article " + article_url + ": " + e.__str__())
+            return False
 
+    def __extract_and_save_triples_batch(self, articles, extraction_scope, kg_auto_update):
+        """
+        Private method to extract triples from a batch of articles and save the triples to DB.
+        Non-conflicting triples are added to knowledge graph if kg_auto_update is True.
+        The triples of the batch are checked against the knowledge graph at once. If that check fails, the triples of
+        each article are checked on their own, so that only the articles whose check fails are left pending.
+
+        :param articles: articles (with their source and texts) whose triples are going to be extracted
+        :type articles: list
+        :param extraction_scope: The scope of the extraction, deciding whether it should include only relations between
+            'named_entities', 'noun_phrases', or 'all.
+        :type extraction_scope: str
+        :param kg_auto_update: whether the non-conflicting triples are added to the knowledge graph or not.
+        :type kg_auto_update: bool
+        :return: number of articles whose triples have been saved
+        :rtype: int
+        """
+        spacy_docs = self.__parse_articles(articles)
+        extracted = []
+        for article, spacy_doc in zip(articles, spacy_docs):
+            self.logger.info('Extracting triples for article: %s', article['source'])
+            try:
+                extracted.append((article['source'], self.__produce_article_triples(article['texts'], extraction_scope,
+                                                                                    spacy_doc)))
             except Exception as e:
                 self.logger.error("Exception occurred when extracting article " + article['source'] + ": " + e.__str__())
+        if len(extracted) == 0:
+            return 0
 
-    def __extract_and_save_triples(self, url, texts, extraction_scope, kg_auto_update):
+        try:
+            self.__mark_existing_triples([triple for _, triples in extracted for sentence in triples
+                                          for triple in sentence['triples']])
+            checked = True
+        except Exception as e:
+            # e.g. a triple that cannot be sent to the knowledge graph, which must not hold back the other articles
+            self.logger.error("Exception occurred when checking the triples of a batch of %d articles, checking them "
+                              "one by one: %s", len(extracted), e.__str__())
+            checked = False
+        # an article is only marked as extracted once all its triples have been saved
+        saved = []
+        for url, triples in extracted:
+            try:
+                if not checked:
+                    self.__mark_existing_triples([triple for sentence in triples for triple in sentence['triples']])
+                self.__save_article_triples(url, triples)
+                saved.append(url)
+            except Exception as e:
+                self.logger.error("Exception occurred when saving triples of article " + url + ": " + e.__str__())
+        if len(saved) == 0:
+            return 0
+        self.db_article_collection.bulk_write([UpdateOne({'source': url}, {'$set': {'extracted': True}})
+                                               for url in saved], ordered=False)
+
+        if (kg_auto_update is None and self.auto_update) or kg_auto_update:
+            for url in saved:
+                self.logger.info('Inserting non conflicting knowledge for ' + url)
+                self.insert_all_nonconflicting_knowledge(url)
+        return len(saved)
+
+    def __parse_articles(self, articles):
+        """
+        Private method to parse the texts of a batch of articles together.
+        Articles without any text are not parsed, so that they fail on their own when their triples are extracted. If
+        parsing the batch fails, none of the articles are parsed, and each article is parsed on its own instead.
+
+        :param articles: articles (with their source and texts)
+        :type articles: list
+        :return: list of spacy documents in the same order as the articles, None for the articles that are not parsed
+        :rtype: list
+        """
+        spacy_docs = [None] * len(articles)
+        parsable = [i for i, article in enumerate(articles)
+                    if isinstance(article.get('texts'), str) and article['texts'].strip() != '']
+        if len(parsable) == 0:
+            return spacy_docs
+        try:
+            parsed = list(self.triple_producer.parse_all([articles[i]['texts'] for i in parsable],
+                                                         batch_size=len(parsable)))
+        except Exception as e:
+            self.logger.error("Exception occurred when parsing a batch of %d articles, parsing them one by one: %s",
+                              len(parsable), e.__str__())
+            return spacy_docs
+        for i, spacy_doc in zip(parsable, parsed):
+            spacy_docs[i] = spacy_doc
+        return spacy_docs
+
+    def __extract_and_save_triples(self, url, texts, extraction_scope, kg_auto_update, lease_owner=None):
         """
         Private method to extract triples and an article given the URL and save the triples to DB.
         Non-conflicting triples are added to knowledge graph if kg_auto_update is True.
+        If lease_owner is given, the triples are only saved if the article is still leased by it, and the lease is
+        released.
 
         :param url: URL of article whose triples are going to be extracted
         :type url: str
@@ -81,26 +525,169 @@ class KnowledgeGraphUpdater:
         :type extraction_scope: str
         :param kg_auto_update: whether the non-conflicting triples are added to the knowledge graph or not.
         :type kg_auto_update: bool
+        :param lease_owner: unique ID of the worker that claimed the article, if any
+        :type lease_owner: str
         """
         self.logger.info('Extracting triples for article: %s', url)
-        # set 'added' to False for all triples initially
-        triples = [{'sentence': results[0],
-                    'triples': [{**triple.to_dict(), **{'added': False}} for triple in results[1]]}
-                   for results in self.triple_producer.produce_triples(texts,
-                                                                       extraction_scope=extraction_scope)]
-        for sentence in triples:
-            for triple in sentence['triples']:
-                exists = self.knowledge_graph.check_triple_object_existence(Triple.from_dict(triple))
-                # The exact triple already exists in the KG. Mark as added.
-                if exists is True:
-                    triple['added'] = True
+        triples = self.__produce_article_triples(texts, extraction_scope)
+        self.__mark_existing_triples([triple for sentence in triples for triple in sentence['triples']])
 
-        self.db_article_collection.update_one({'source': url}, {'$set': {'triples': triples}})
+        if lease_owner is not None and self.db_article_collection.find_one({'source': url, 'lease_owner': lease_owner},
+                                                                            {'_id': 1}) is None:
+            self.logger.warning("Triples of article %s are not saved, because its lease has been lost by %s",
+                                url, lease_owner)
+            return
+        # the article is only marked as extracted, and its lease released, once all its triples have been saved
+        self.__save_article_triples(url, triples)
+        if lease_owner is None:
+            self.db_article_collection.update_one({'source': url}, {'$set': {'extracted': True}})
+        else:
+            result = self.db_article_collection.update_one({'source': url, 'lease_owner': lease_owner},
+                                                           {'$set': {'extracted': True},
+                                                            '$unset': {'lease_owner': '', 'lease_expires': ''}})
+            if result.matched_count == 0:
+                # the worker that holds the lease now replaces the triples when it extracts the article
+                self.logger.warning("Article %s is not marked as extracted, because its lease has been lost by %s",
+                                    url, lease_owner)
+                return
 
         if (kg_auto_update is None and self.auto_update) or kg_auto_update:
             self.logger.info('Inserting non conflicting knowledge for ' + url)
             self.insert_all_nonconflicting_knowledge(url)
 
+    def __produce_article_triples(self, texts, extraction_scope, spacy_doc=None):
+        """
+        Private method to produce the triples of an article, in the format they are stored in DB.
+        'added' is set to False for all triples initially.
+
+        :param texts: article text whose triples are going to be extracted
+        :type texts: str
+        :param extraction_scope: The scope of the extraction, deciding whether it should include only relations between
+            'named_entities', 'noun_phrases', or 'all.
+        :type extraction_scope: str
+        :param spacy_doc: the article text already parsed, if any
+        :type spacy_doc: spacy.tokens.Doc
+        :return: list of sentences and their triples
+        :rtype: list
+        """
+        return [{'sentence': results[0],
+                 'triples': [{**triple.to_dict(), **{'added': False}} for triple in results[1]]}
+                for results in self.triple_producer.produce_triples(texts, extraction_scope=extraction_scope,
+                                                                    spacy_doc=spacy_doc)]
+
+    def __mark_existing_triples(self, triples):
+        """
+        Private method to mark the triples whose exact triple already exists in the KG as added, with a bulk check.
+
+        :param triples: triples in the format they are stored in DB
+        :type triples: list
+        """
+        exists = self.knowledge_graph.check_triples_existence_bulk([Triple.from_dict(triple) for triple in triples])
+        for triple, triple_exists in zip(triples, exists):
+            if triple_exists is True:
+                triple['added'] = True
+
+    def claim_article(self, worker_id, lease_duration=None):
+        """
+        Atomically claims a stored article whose triples has not been extracted yet, and which is not leased by another
+        worker (or whose lease has expired, e.g. because its worker crashed).
+
+        :param worker_id: unique ID of the worker claiming the article
+        :type worker_id: str
+        :param lease_duration: number of seconds the article is leased for, defaults to LEASE_DURATION
+        :type lease_duration: int
+        :return: the claimed article (with its source and texts), or None if there is no article to claim
+        :rtype: dict or None
+        """
+        lease_duration = self.LEASE_DURATION if lease_duration is None else lease_duration
+        now = datetime.utcnow()
+        return self.db_article_collection.find_one_and_update(
+            {'extracted': False, 'lease_expires': {'$not': {'$gt': now}}},
+            {'$set': {'lease_owner': worker_id, 'lease_expires': now + timedelta(seconds=lease_duration)}},
+            projection={'source': 1, 'texts': 1},
+            return_document=ReturnDocument.AFTER)
+
+    def renew_lease(self, article_url, worker_id, lease_duration=None):
+        """
+        Extends the lease of an article claimed by the worker.
+
+        :param article_url: URL of the article source
+        :type article_url: str
+        :param worker_id: unique ID of the worker that claimed the article
+        :type worker_id: str
+        :param lease_duration: number of seconds the lease is extended for from now, defaults to LEASE_DURATION
+        :type lease_duration: int
+        :return: True if the worker still holds the lease, False otherwise
+        :rtype: bool
+        """
+        lease_duration = self.LEASE_DURATION if lease_duration is None else lease_duration
+        result = self.db_article_collection.update_one(
+            {'source': article_url, 'lease_owner': worker_id},
+            {'$set': {'lease_expires': datetime.utcnow() + timedelta(seconds=lease_duration)}})
+        return result.matched_count > 0
+
+    def process_claimed_articles(self, worker_id, extraction_scope=None, kg_auto_update=None, lease_duration=None):
+        """
+        Claims articles one by one and extracts their triples, until there is no article left to claim.
+        While an article is processed, its lease is renewed by a heartbeat thread. The triples are only saved if the
+        worker still holds the lease, so an article is never saved by two workers.
+        If the extraction fails, the article is left leased, and it is retried by any worker once the lease expires.
+
+        :param worker_id: unique ID of the worker
+        :type worker_id: str
+        :param extraction_scope: The scope of the extraction, deciding whether it should include only relations between
+            'named_entities', 'noun_phrases', or 'all.
+        :type extraction_scope: str
+        :param kg_auto_update: whether the non-conflicting triples are added to the knowledge graph or not.
+        :type kg_auto_update: bool
+        :param lease_duration: number of seconds an article is leased for, defaults to LEASE_DURATION
+        :type lease_duration: int
+        :return: number of articles claimed
+        :rtype: int
+        """
+        lease_duration = self.LEASE_DURATION if lease_duration is None else lease_duration
+        claimed = 0
+        while True:
+            article = self.claim_article(worker_id, lease_duration)
+            if article is None:
+                return claimed
+            claimed += 1
+            stop_heartbeat = threading.Event()
+            heartbeat = threading.Thread(target=self.__heartbeat,
+                                         args=(article['source'], worker_id, lease_duration, stop_heartbeat),
+                                         daemon=True)
+            heartbeat.start()
+            try:
+                self.__extract_and_save_triples(article['source'], article['texts'], extraction_scope, kg_auto_update,
+                                                lease_owner=worker_id)
+            except Exception as e:
+                self.logger.error("Exception occurred when extracting article " + article['source'] + ": " + e.__str__())
+            finally:
+                stop_heartbeat.set()
+                heartbeat.join()
+
+    def __heartbeat(self, article_url, worker_id, lease_duration, stop):
+        """
+        Private method that renews the lease of an article every third of the lease duration, until it is stopped or
+        the lease is lost.
+
+        :param article_url: URL of the article source
+        :type article_url: str
+        :param worker_id: unique ID of the worker that claimed the article
+        :type worker_id: str
+        :param lease_duration: number of seconds the lease is extended for
+        :type lease_duration: int
+        :param stop: event that stops the heartbeat
+        :type stop: threading.Event
+        """
+        while not stop.wait(lease_duration / 3):
+            try:
+                if not self.renew_lease(article_url, worker_id, lease_duration):
+                    self.logger.warning("Lease of article %s has been lost by worker %s", article_url, worker_id)
+                    return
+            except Exception as e:
+                self.logger.error("Exception occurred when renewing lease of article " + article_url + ": " + e.__str__())
+
     def insert_all_nonconflicting_knowledge(self, article_url):
         """
         Insert non-conflicting triples of an article to the knowledge graph.
@@ -108,20 +695,29 @@ class KnowledgeGraphUpdater:
         :param article_url: URL of the article source
         :type article_url: str
         """
-        article = self.db_article_collection.find_one({'source': article_url})
-        for sentence in article['triples']:
-            for triple in sentence['triples']:
-                if self.knowledge_graph.check_triple_object_existence(Triple.from_dict(triple)):
-                    triple['added'] = True
+        flat_triples = list(self.__find_article_triples({'source': article_url}))
+        exists = self.knowledge_graph.check_triples_existence_bulk([Triple.from_dict(triple) for triple in flat_triples])
+        nonconflicting = []
+        for triple, triple_exists in zip(flat_triples, exists):
+            if triple_exists:
+                triple['added'] = True
+            else:
+                conflicts = self.knowledge_graph.get_triples(triple['subject'], triple['relation'], transitive=True)
+                # triples that are going to be inserted also conflict with the later ones
+                conflicts_pending = any(triple['subject'] == other['subject'] and triple['relation'] == other['relation']
+                                        for other in nonconflicting)
+                # if triple not in conflicts:
+                if (conflicts is None or len(conflicts) < 1) and not conflicts_pending:
+                    nonconflicting.append(triple)
                 else:
-                    conflicts = self.knowledge_graph.get_triples(triple['subject'], triple['relation'], transitive=True)
-                    # if triple not in conflicts:
-                    if conflicts is None or len(conflicts) < 1:
-                        self.knowledge_graph.insert_triple_object(Triple.from_dict(triple))
-                        triple['added'] = True
-                    else:
-                        triple['added'] = False
-        self.db_article_collection.update_one({'source': article['source']}, {'$set': {'triples': article['triples']}})
+                    triple['added'] = False
+        inserted = self.knowledge_graph.insert_triples_bulk([Triple.from_dict(triple) for triple in nonconflicting])
+        for triple, triple_inserted in zip(nonconflicting, inserted):
+            triple['added'] = triple_inserted
+        if len(flat_triples) > 0:
+            self.db_article_triples_collection.bulk_write([UpdateOne({'_id': triple['_id']},
+                                                                     {'$set': {'added': triple['added']}})
+                                                           for triple in flat_triples], ordered=False)
 
     def delete_all_knowledge_from_article(self, article_url):
         """
@@ -130,48 +726,54 @@ class KnowledgeGraphUpdater:
 
         :param article_url: URL of the article source
         :type article_url: str
+        :return: list of the triples that could not be deleted from the knowledge graph
+        :rtype: list
         """
         self.logger.info('Deleting triples of article: %s', article_url)
-        article = self.db_article_collection.find_one({'source': article_url})
-        if 'triples' in article:
-            for sentence in article['triples']:
-                self.delete_knowledge(sentence['triples'])
+        triples = [{'subject': triple['subject'], 'relation': triple['relation'], 'objects': triple['objects']}
+                   for triple in self.__find_article_triples({'source': article_url})]
+        deleted = self.delete_knowledge(triples)
+        return [triple for triple, triple_deleted in zip(triples, deleted) if not triple_deleted]
 
     def delete_knowledge(self, triples):
         """
         Remove triples from knowledge graph.
+        Only the triples that have been deleted from the knowledge graph are marked as not 'added' in the db.
 
         :param triples: list of triples (in the form of dictionaries)
         :type triples: list
+        :return: list of booleans in the same order as the triples, True if the triple was deleted
+        :rtype: list
         """
-        for triple in triples:
-            self.knowledge_graph.delete_triple_object(Triple.from_dict(triple), transitive=True)
-            # Need to update both triples from articles and from user input. We don't know where the triple was from.
-            self.db_article_collection.update_many({'triples': {'$exists': True}},
-                                                   {'$set': {'triples.$[].triples.$[triple].added': False}},
-                                                   array_filters=[{'triple.subject': triple['subject'],
-                                                                   'triple.relation': triple['relation'],
-                                                                   'triple.objects': triple['objects']
-                                                                   }])
-            self.db_triples_collection.update_one({'subject': triple['subject'],
-                                                   'relation': triple['relation'],
-                                                   'objects': triple['objects']},
-                                                  {'$set': {'added': False}})
+        deleted = self.knowledge_graph.delete_triples_bulk([Triple.from_dict(triple) for triple in triples],
+                                                           transitive=True)
+        triples = [triple for triple, triple_deleted in zip(triples, deleted) if triple_deleted]
+        if len(triples) == 0:
+            return deleted
+        # Need to update both triples from articles and from user input. We don't know where the triple was from.
+        self.db_article_triples_collection.bulk_write([
+            UpdateMany({'triple_key': self.__triple_key(triple)}, {'$set': {'added': False}}) for triple in triples],
+            ordered=False)
+        self.db_triples_collection.bulk_write([
+            UpdateOne({'subject': triple['subject'], 'relation': triple['relation'], 'objects': triple['objects']},
+                      {'$set': {'added': False}})
+            for triple in triples], ordered=False)
+        return deleted
 
     def get_article_pending_knowledge(self, article_url):
         """
         Returns all pending triples (that are not currently in the knowledge graph) for the specified article.
+        Sentences without any pending triple are left out.
 
         :param article_url: URL of the article source
         :type article_url: str
         :return: list of pending triples extracted from the article if exist, or None
         :rtype: list or None
         """
-        article = self.db_article_collection.find_one({'source': article_url, 'triples': {'$exists': True}})
+        article = self.db_article_collection.find_one({'source': article_url, 'extracted': True}, {'_id': 1})
         if article is not None:
-            return [{'sentence': sentence['sentence'],
-                     'triples': [triple for triple in sentence['triples'] if triple['added'] is False]}
-                    for sentence in article['triples']]
+            pending = next(self.__aggregate_pending_triples({'source': article_url}), None)
+            return pending['triples'] if pending is not None else []
 
     def delete_article_pending_knowledge(self, article_url, triples):
         """
@@ -182,35 +784,39 @@ class KnowledgeGraphUpdater:
         :param triples: list of pending triples to be deleted
         :type triples: list
         """
-        for sentence in triples:
-            for triple in sentence['triples']:
-                self.db_article_collection.update_one({'source': article_url},
-                                                      {'$pull': {'triples.$[sentence].triples':
-                                                                     {'subject': triple['subject'],
-                                                                      'relation': triple['relation'],
-                                                                      'objects': triple['objects']}}},
-                                                      array_filters=[{'sentence.sentence': sentence['sentence']}])
+        operations = [DeleteMany({'source': article_url, 'sentence': sentence['sentence'],
+                                  'triple_key': self.__triple_key(triple)})
+                      for sentence in triples for triple in sentence['triples']]
+        if len(operations) > 0:
+            self.db_article_triples_collection.bulk_write(operations, ordered=False)
 
-    def get_all_pending_knowledge(self):
+    def get_all_pending_knowledge(self, cursor=None, limit=None):
         """
-        Returns all pending triples (that are not currently in the knowledge graph) for all scraped articles.
+        Returns a page of pending triples (that are not currently in the knowledge graph) for all scraped articles.
 
-        :return: list of all pending triples extracted from all articles
-        :rtype: list
+        :param cursor: cursor returned with the previous page, or None for the first page
+        :type cursor: str
+        :param limit: maximum number of articles in the page, defaults to PAGE_SIZE
+        :type limit: int
+        :return: tuple of the list of pending triples extracted from the articles of the page, and the cursor of the
+            next page (None if it is the last page)
+        :rtype: tuple
+        :raises ValueError: if the limit is invalid
         """
-        # TODO: add pagination
-        articles = []
-        for article in self.db_article_collection.find({'triples': {'$exists': True}}):
-            pending = [{'sentence': sentence['sentence'],
-                        'triples': [triple for triple in sentence['triples'] if triple['added'] is False]}
-                       for sentence in article['triples']]
-            # pending = [triple for triple in article['triples'] if triple['added'] is False]
-            if len(pending) > 0:
-                articles.append({
-                    'source': article['source'],
-                    'triples': pending
-                })
-        return articles
+        return self.__find_pending_triples_page(cursor, limit)
+
+    def iterate_all_pending_knowledge(self, cursor=None):
+        """
+        Iterates over the pending triples (that are not currently in the knowledge graph) of all scraped articles, one
+        article at a time.
+        Unlike get_all_pending_knowledge, the memory use does not depend on the number of articles.
+
+        :param cursor: cursor of the page to start from, or None to start from the first article
+        :type cursor: str
+        :return: generator of the pending triples extracted from the articles
+        :rtype: generator
+        """
+        return self.__iterate_pages(self.get_all_pending_knowledge, cursor)
 
     def get_article_knowledge(self, article_url):
         """
@@ -222,22 +828,38 @@ class KnowledgeGraphUpdater:
         :return: list of triples extracted from the article if exist, or None
         :rtype: list or None
         """
-        article = self.db_article_collection.find_one({'source': article_url, 'triples': {'$exists': True}})
+        article = self.db_article_collection.find_one({'source': article_url, 'extracted': True}, {'_id': 1})
         if article is None:
             return None
-        return article['triples']
+        return self.__group_article_triples(self.__find_article_triples({'source': article_url}))
 
-    def get_all_articles_knowledge(self):
+    def get_all_articles_knowledge(self, cursor=None, limit=None):
         """
-        Returns all triples that have been extracted from all scraped articles.
+        Returns a page of triples that have been extracted from all scraped articles.
 
-        :return: list of all triples extracted from all articles
-        :rtype: list
+        :param cursor: cursor returned with the previous page, or None for the first page
+        :type cursor: str
+        :param limit: maximum number of articles in the page, defaults to PAGE_SIZE
+        :type limit: int
+        :return: tuple of the list of triples extracted from the articles of the page, and the cursor of the next page
+            (None if it is the last page)
+        :rtype: tuple
+        :raises ValueError: if the cursor or the limit is invalid
+        """
+        return self.__find_articles_triples_page(cursor, limit)
+
+    def iterate_all_articles_knowledge(self, cursor=None):
+        """
+        Iterates over the triples that have been extracted from all scraped articles, one article at a time.
+        Unlike get_all_articles_knowledge, the memory use does not depend on the number of articles.
+
+        :param cursor: cursor of the page to start from, or None to start from the first article
+        :type cursor: str
+        :return: generator of the triples extracted from the articles
+        :rtype: generator
+        :raises ValueError: if the cursor is invalid
         """
-        # This function is memory expensive if the list is huge. It's better to add pagination etc.
-        # TODO: add pagination
-        return list(
-            self.db_article_collection.find({'triples': {'$exists': True}}, {'source': 1, 'triples': 1, '_id': 0}))
+        return self.__iterate_pages(self.get_all_articles_knowledge, cursor)
 
     def get_all_unresolved_corefering_entities(self):
         """
@@ -246,17 +868,25 @@ class KnowledgeGraphUpdater:
         :return: list of unresolved corefering entities
         :rtype: list
         """
-        articles = []
-        for article in self.db_article_collection.find({'coref_entities': {'$exists': True}}):
-            entities = [{'main': ent['main'],
-                         'mentions': [mention for mention in ent['mentions'] if mention['resolved'] is False]}
-                        for ent in article['coref_entities']]
-            entities = [ent for ent in entities if len(ent['mentions']) > 0]
-            articles.append({
-                'source': article['source'],
-                'coref_entities': entities
-            })
-        return articles
+        return list(self.db_article_collection.aggregate([
+            {'$match': {'coref_entities.mentions.resolved': False}},
+            {'$project': {
+                '_id': 0,
+                'source': 1,
+                'coref_entities': {'$filter': {
+                    'input': {'$map': {
+                        'input': '$coref_entities',
+                        'as': 'entity',
+                        'in': {'main': '$$entity.main',
+                               'mentions': {'$filter': {'input': '$$entity.mentions',
+                                                        'as': 'mention',
+                                                        'cond': {'$eq': ['$$mention.resolved', False]}}}}
+                    }},
+                    'as': 'entity',
+                    'cond': {'$gt': [{'$size': '$$entity.mentions'}, 0]}
+                }}
+            }}
+        ]))
 
     def insert_entities_equality(self, entity_a, entity_b):
         """
@@ -274,53 +904,52 @@ class KnowledgeGraphUpdater:
         Insert triples that are related to an article to the knowledge graph.
         If the triple has conflict, mark the conflict as 'added' in the db.
         If the triple doesn't exist on db, add the triple to the db.
+        All triples are inserted to the knowledge graph with one bulk insert, and the db is updated with one bulk write.
+        Only the triples that have been inserted to the knowledge graph are marked as 'added'.
 
         :param articles_triples: dictionary of article triples
         :type articles_triples: dict
+        :return: list of booleans in the order of the triples of the articles and their sentences, True if the triple
+            was inserted
+        :rtype: list
         """
-        for article in articles_triples:
-            stored_triples = self.db_article_collection.find_one({'source': article['source']})['triples']
-            for sentence in article['triples']:
-                stored_sentence = next((sent_triples for sent_triples in stored_triples
-                                        if sent_triples['sentence'] == sentence['sentence']), None)
-                for triple in sentence['triples']:
-                    # FIXME: check for conflict? probably no need to
-                    self.knowledge_graph.insert_triple_object(Triple.from_dict(triple))
-                    if stored_sentence is not None and triple in stored_sentence['triples']:
-                        self.db_article_collection.update_many({'source': article['source']},
-                                                               {'$set': {
-                                                                   'triples.$[].triples.$[triple].added': True}},
-                                                               array_filters=[
-                                                                   {'triple.subject': triple['subject'],
-                                                                    'triple.relation': triple['relation'],
-                                                                    'triple.objects': triple['objects']
-                                                                    }]
-                                                               )
-
-                    # new triple from existing sentence
-                    elif stored_sentence is not None:
-                        self.db_article_collection.update_one({'source': article['source'],
-                                                               'triples': {'$elemMatch':
-                                                                               {'sentence': stored_sentence[
-                                                                                   'sentence']}}},
-                                                              {'$push': {'triples.$.triples':
-                                                                             {'subject': triple['subject'],
-                                                                              'relation': triple['relation'],
-                                                                              'objects': triple['objects'],
-                                                                              'added': True}}}
-                                                              )
-                        # may need to check other sentences, or even articles for the same triple
-                    # new triple from non-existing sentence
-                    else:
-                        # accommodate triples about the article that are manually inserted
-                        self.db_article_collection.update_one({'source': article['source']},
-                                                              {'$push': {'triples': {'sentence': '', 'triples': [
-                                                                  {'subject': triple['subject'],
-                                                                   'relation': triple['relation'],
-                                                                   'objects': triple['objects'],
-                                                                   'added': True}]}
-                                                                         }})
-                        # may need to check other sentences, or even articles for the same triple
+        flat_triples = [(article['source'], sentence['sentence'], triple) for article in articles_triples
+                        for sentence in article['triples'] for triple in sentence['triples']]
+        if len(flat_triples) == 0:
+            return []
+
+        stored_sentences = {}
+        stored_triples = set()
+        for document in self.db_article_triples_collection.find(
+                {'source': {'$in': list({source for source, _, _ in flat_triples})}},
+                {'source': 1, 'sentence': 1, 'sentence_index': 1, 'triple_key': 1}):
+            stored_sentences.setdefault((document['source'], document['sentence']), document['sentence_index'])
+            stored_triples.add((document['source'], document['sentence_index'], document['triple_key']))
+
+        # FIXME: check for conflict? probably no need to
+        inserted = self.knowledge_graph.insert_triples_bulk([Triple.from_dict(triple) for _, _, triple in flat_triples])
+        operations = []
+        for (source, sentence, triple), triple_inserted in zip(flat_triples, inserted):
+            if not triple_inserted:
+                continue
+            sentence_index = stored_sentences.get((source, sentence))
+            triple_key = self.__triple_key(triple)
+            if sentence_index is not None and (source, sentence_index, triple_key) in stored_triples:
+                operations.append(UpdateMany({'source': source, 'triple_key': triple_key}, {'$set': {'added': True}}))
+                continue
+            # new triple from existing sentence, or
+            # new triple from non-existing sentence (triples about the article that are manually inserted)
+            key = {'source': source, 'sentence_index': sentence_index, 'triple_key': triple_key}
+            operations.append(UpdateOne(key, {'$set': {**key,
+                                                       'sentence': sentence if sentence_index is not None else '',
+                                                       'subject': triple['subject'],
+                                                       'relation': triple['relation'],
+                                                       'objects': triple['objects'],
+                                                       'added': True}}, upsert=True))
+            # may need to check other sentences, or even articles for the same triple
+        if len(operations) > 0:
+            self.db_article_triples_collection.bulk_write(operations, ordered=False)
+        return inserted
 
     def insert_knowledge(self, triple, check_conflict):
         """
@@ -350,6 +979,31 @@ class KnowledgeGraphUpdater:
                                                'objects': triple['objects']},
                                               {'$set': {'added': True}})
 
+    def insert_knowledge_bulk(self, triples):
+        """
+        Insert triples to the knowledge graph without checking for conflicts, using as few requests as possible.
+
+        :param triples: list of triples to be inserted to the knowledge graph (in the form of dictionaries)
+        :type triples: list
+        :return: list of booleans in the same order as the triples, True if the triple was inserted
+        :rtype: list
+        """
+        if len(triples) == 0:
+            return []
+        self.db_triples_collection.bulk_write([ReplaceOne({'subject': triple['subject'],
+                                                           'relation': triple['relation'],
+                                                           'objects': triple['objects']},
+                                                          triple, upsert=True) for triple in triples], ordered=False)
+        inserted = self.knowledge_graph.insert_triples_bulk([Triple.from_dict(triple) for triple in triples])
+        added = [UpdateOne({'subject': triple['subject'],
+                            'relation': triple['relation'],
+                            'objects': triple['objects']},
+                           {'$set': {'added': True}}) for triple, triple_inserted in zip(triples, inserted)
+                 if triple_inserted]
+        if len(added) > 0:
+            self.db_triples_collection.bulk_write(added, ordered=False)
+        return inserted
+
     def get_knowledge(self, subject, relation, objects=None):
         """
         Returns triple from the knowledge graph that has the given conditions.
@@ -383,23 +1037,39 @@ class KnowledgeGraphUpdater:
         """
         return self.knowledge_graph.get_entity(subject)
 
-    def get_all_articles(self):
+    def get_all_articles(self, cursor=None, limit=None):
         """
-        Returns all articles' URLs, headlines, and dates, in the form of dictionaries.
+        Returns a page of all articles' URLs, headlines, and dates, in the form of dictionaries.
 
-        :return: list of dictionaries of articles
-        :rtype: list
+        :param cursor: cursor returned with the previous page, or None for the first page
+        :type cursor: str
+        :param limit: maximum number of articles in the page, defaults to PAGE_SIZE
+        :type limit: int
+        :return: tuple of the list of dictionaries of articles, and the cursor of the next page (None if it is the last
+            page)
+        :rtype: tuple
+        :raises ValueError: if the cursor or the limit is invalid
+        """
+        articles, next_cursor = self.__find_articles_page({}, {'source': 1, 'date': 1, 'headlines': 1}, cursor,
+                                                          limit)
+        return [{
+            'source': article['source'],
+            'headlines': '. '.join(article['headlines']),
+            'date': article['date'].timestamp()
+        } for article in articles], next_cursor
+
+    def iterate_all_articles(self, cursor=None):
         """
-        # TODO: pagination
-        articles = []
-        for article in self.db_article_collection.find({},
-                                                       {'_id': False, 'source': True, 'date': True, 'headlines': True}):
-            articles.append({
-                'source': article['source'],
-                'headlines': '. '.join(article['headlines']),
-                'date': article['date'].timestamp()
-            })
-        return articles
+        Iterates over all articles' URLs, headlines, and dates, in the form of dictionaries.
+        Unlike get_all_articles, the memory use does not depend on the number of articles.
+
+        :param cursor: cursor of the page to start from, or None to start from the first article
+        :type cursor: str
+        :return: generator of the dictionaries of the articles
+        :rtype: generator
+        :raises ValueError: if the cursor is invalid
+        """
+        return self.__iterate_pages(self.get_all_articles, cursor)
 
     def extract_new_article(self, url, extraction_scope='noun_phrases', kg_auto_update=False):
         """
@@ -419,21 +1089,38 @@ class KnowledgeGraphUpdater:
         except Exception as e:
             self.logger.error("Exception occured when extracting article " + url + ": " + e.__str__())
 
-    def get_all_extracted_articles(self):
+    def get_all_extracted_articles(self, cursor=None, limit=None):
         """
-        Returns all articles' URLs, headlines, and dates, whose triples have been extracted,
+        Returns a page of all articles' URLs, headlines, and dates, whose triples have been extracted,
         in the form of dictionaries.
 
-        :return: list of dictionaries of articles
-        :rtype: list
+        :param cursor: cursor returned with the previous page, or None for the first page
+        :type cursor: str
+        :param limit: maximum number of articles in the page, defaults to PAGE_SIZE
+        :type limit: int
+        :return: tuple of the list of dictionaries of articles, and the cursor of the next page (None if it is the last
+            page)
+        :rtype: tuple
+        :raises ValueError: if the cursor or the limit is invalid
+        """
+        articles, next_cursor = self.__find_articles_page({'extracted': True},
+                                                          {'source': 1, 'date': 1, 'headlines': 1}, cursor, limit)
+        return [{
+            'source': article['source'],
+            'headlines': '. '.join(article['headlines']),
+            'date': article['date'].timestamp()
+        } for article in articles], next_cursor
+
+    def iterate_all_extracted_articles(self, cursor=None):
+        """
+        Iterates over all articles' URLs, headlines, and dates, whose triples have been extracted,
+        in the form of dictionaries.
+        Unlike get_all_extracted_articles, the memory use does not depend on the number of articles.
+
+        :param cursor: cursor of the page to start from, or None to start from the first article
+        :type cursor: str
+        :return: generator of the dictionaries of the articles
+        :rtype: generator
+        :raises ValueError: if the cursor is invalid
         """
-        # TODO: pagination
-        articles = []
-        for article in self.db_article_collection.find({'triples': {'$exists': True}},
-                                                       {'_id': False, 'source': True, 'date': True, 'headlines': True}):
-            articles.append({
-                'source': article['source'],
-                'headlines': '. '.join(article['headlines']),
-                'date': article['date'].timestamp()
-            })
-        return articles
+        return self.__iterate_pages(self.get_all_extracted_articles, cursor)
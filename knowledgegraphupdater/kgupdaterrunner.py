@@ -1,13 +1,123 @@
+import argparse
+import logging.config
+import multiprocessing
+import os
+import socket
+import time
+
+from definitions import ROOT_DIR, LOGGER_CONFIG_PATH
+from .articlewatcher import ArticleWatcher
 from .kgupdater import KnowledgeGraphUpdater
 
+IDLE_INTERVAL = 10  # seconds to wait before looking for articles again, once no article is left (or only failing ones)
+SUPERVISOR_INTERVAL = 5  # seconds between checks of the supervisor for dead workers
+
+
+def run_worker(worker_index):
+    """
+    A worker of the worker pool, which keeps claiming articles and extracting their triples.
+
+    :param worker_index: index of the worker in the pool
+    :type worker_index: int
+    """
+    kgu = KnowledgeGraphUpdater()
+    worker_id = '{0}-{1}-{2}'.format(socket.gethostname(), os.getpid(), worker_index)
+    kgu.logger.info('Worker %s started', worker_id)
+    while True:
+        if kgu.process_claimed_articles(worker_id) == 0:
+            time.sleep(IDLE_INTERVAL)
+
+
+def run_worker_pool(workers):
+    """
+    Runs a pool of worker processes, and restarts any worker that has died.
+    Articles leased by a dead worker are claimed again by the other workers once the lease expires.
+
+    :param workers: number of worker processes
+    :type workers: int
+    """
+    LOGFILE_PATH = os.path.join(ROOT_DIR, 'logs', 'kg-updater.log').replace("\\", "/")
+    logging.config.fileConfig(LOGGER_CONFIG_PATH,
+                              defaults={'logfilename': LOGFILE_PATH},
+                              disable_existing_loggers=False)
+    logger = logging.getLogger()
+    processes = {}
+    while True:
+        for index in range(workers):
+            process = processes.get(index)
+            if process is None or not process.is_alive():
+                if process is not None:
+                    logger.warning('Worker %d died with exit code %s, restarting it', index, process.exitcode)
+                process = multiprocessing.Process(target=run_worker, args=(index,), daemon=True)
+                process.start()
+                processes[index] = process
+        time.sleep(SUPERVISOR_INTERVAL)
+
+
+def run_watcher():
+    """
+    Extracts the triples of new articles as they are inserted, instead of querying the pending articles repeatedly.
+    Articles that fail to be extracted are queued again by the next sweep of the watcher.
+    """
+    kgu = KnowledgeGraphUpdater()
+    watcher = ArticleWatcher(kgu.db_article_collection)
+    watcher.start()
+    while True:
+        article_url = watcher.get()
+        if kgu.update_article_knowledge(article_url):
+            kgu.logger.info('Processed article %s (queue depth: %d)', article_url, watcher.queue_depth)
+        else:
+            kgu.logger.warning('Article %s was not extracted, it is retried on the next sweep (queue depth: %d)',
+                               article_url, watcher.queue_depth)
+
 
 def main():
     """
     A runner for the Knowledge Graph Updater to keep extracting triples from new scraped articles.
+    By default, a single process extracts the articles. With --workers, a pool of worker processes claims the articles.
+    With --watch, a single process extracts the articles as they are inserted.
+    With --migrate, the articles stored in an older format are migrated once, and nothing is extracted.
     """
+    parser = argparse.ArgumentParser(description='Keep extracting triples from new scraped articles.')
+    parser.add_argument('--workers', type=int, default=None,
+                        help='number of worker processes that claim articles, instead of a single process')
+    parser.add_argument('--watch', action='store_true',
+                        help='extract new articles as they are inserted, using a change stream or polling with backoff')
+    parser.add_argument('--batch-size', type=int, default=None,
+                        help='number of articles parsed together by the single process, defaults to '
+                             + str(KnowledgeGraphUpdater.UPDATE_BATCH_SIZE))
+    parser.add_argument('--migrate', action='store_true',
+                        help='migrate the articles stored in an older format and exit, before starting any updater')
+    args = parser.parse_args()
+
+    if args.migrate:
+        if args.watch or args.workers is not None or args.batch_size is not None:
+            parser.error('--migrate cannot be used with other options')
+        KnowledgeGraphUpdater().migrate()
+        return
+
+    if args.batch_size is not None:
+        if args.watch or args.workers is not None:
+            parser.error('--batch-size can only be used without --watch and --workers')
+        if args.batch_size < 1:
+            parser.error('--batch-size must be at least 1')
+
+    if args.watch:
+        if args.workers is not None:
+            parser.error('--watch cannot be used with --workers')
+        run_watcher()
+        return
+
+    if args.workers is not None:
+        if args.workers < 1:
+            parser.error('--workers must be at least 1')
+        run_worker_pool(args.workers)
+        return
+
     kgu = KnowledgeGraphUpdater()
     while True:
-        kgu.update_missed_knowledge()
+        if kgu.update_missed_knowledge(batch_size=args.batch_size) == 0:
+            time.sleep(IDLE_INTERVAL)
 
 
 if __name__ == '__main__':
@@ -0,0 +1,48 @@
+import mongomock
+import unittest
+
+from ..articlewatcher import ArticleWatcher
+
+
+class TestArticleWatcher(unittest.TestCase):
+
+    def setUp(self):
+        self.collection = mongomock.MongoClient()['fnd']['articles']
+        self.collection.drop()
+
+    def test_poll_queues_new_articles_only(self):
+        self.collection.insert_many([{'source': 'a', 'extracted': False}, {'source': 'b', 'extracted': True}])
+        watcher = ArticleWatcher(self.collection, use_change_stream=False)
+
+        self.assertEqual(1, watcher.poll())
+        self.assertEqual('a', watcher.get(timeout=0))
+        self.collection.insert_one({'source': 'c', 'extracted': False})
+        self.assertEqual(1, watcher.poll())
+        self.assertEqual('c', watcher.get(timeout=0))
+        self.assertIsNone(watcher.get(timeout=0))
+
+    def test_sweep_queues_failed_articles_again(self):
+        self.collection.insert_one({'source': 'a', 'extracted': False})
+        watcher = ArticleWatcher(self.collection, use_change_stream=False)
+        watcher.poll()
+        watcher.get(timeout=0)
+
+        # the extraction of the article has failed, so it is still pending
+        self.assertEqual(0, watcher.poll())
+        self.assertEqual(1, watcher.sweep())
+        self.assertEqual('a', watcher.get(timeout=0))
+
+    def test_background_sweep(self):
+        self.collection.insert_one({'source': 'a', 'extracted': False})
+        watcher = ArticleWatcher(self.collection, min_poll_interval=0.01, max_poll_interval=0.01,
+                                 use_change_stream=False, sweep_interval=0.05)
+        watcher.start()
+        try:
+            self.assertEqual('a', watcher.get(timeout=1))
+            self.assertEqual('a', watcher.get(timeout=1))
+        finally:
+            watcher.stop()
+
+
+if __name__ == '__main__':
+    unittest.main()
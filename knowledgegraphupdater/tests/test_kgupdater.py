@@ -0,0 +1,278 @@
+import mongomock
+import threading
+import time
+import unittest
+from datetime import datetime, timedelta
+from mock import patch
+
+from common.triple import Triple
+from ..kgupdater import KnowledgeGraphUpdater
+
+
+class TestKnowledgeGraphUpdater(unittest.TestCase):
+
+    def setUp(self):
+        mongomock.MongoClient().drop_database('fnd')
+        patchers = [patch('knowledgegraphupdater.kgupdater.MongoClient', mongomock.MongoClient)]
+        patchers += [patch('knowledgegraphupdater.kgupdater.' + target)
+                     for target in ['TripleProducer', 'KnowledgeGraphWrapper', 'EntityCorefResolver', 'Scrapers']]
+        for patcher in patchers:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.kgu = KnowledgeGraphUpdater()
+        self.kg = self.kgu.knowledge_graph
+
+    @staticmethod
+    def triple(subject, relation='ignore', objects=None, added=False):
+        return {'subject': subject, 'relation': relation, 'objects': objects or ['Social_distancing'], 'added': added}
+
+    def test_delete_knowledge_only_marks_deleted_triples(self):
+        self.kgu.db_triples_collection.insert_many([self.triple('John_Doe', added=True),
+                                                    self.triple('Jane_Doe', added=True)])
+        self.kg.delete_triples_bulk.return_value = [True, False]
+
+        deleted = self.kgu.delete_knowledge([self.triple('John_Doe'), self.triple('Jane_Doe')])
+
+        self.assertEqual([True, False], deleted)
+        self.assertFalse(self.kgu.db_triples_collection.find_one({'subject': 'John_Doe'})['added'])
+        self.assertTrue(self.kgu.db_triples_collection.find_one({'subject': 'Jane_Doe'})['added'])
+
+    def produce_triples(self, document, extraction_scope=None, spacy_doc=None):
+        if document is None:
+            raise TypeError('The article has no text')
+        return [(document, [Triple('John_Doe', 'ignore', ['Social_distancing'])])]
+
+    def test_update_missed_knowledge_skips_articles_without_text(self):
+        self.kgu.db_article_collection.insert_many([{'source': 'a', 'texts': 'John Doe ignored it.', 'extracted': False},
+                                                    {'source': 'b', 'texts': None, 'extracted': False}])
+        self.kgu.triple_producer.parse_all.return_value = iter(['spacy_doc'])
+        self.kgu.triple_producer.produce_triples.side_effect = self.produce_triples
+        self.kg.check_triples_existence_bulk.side_effect = lambda triples: [False] * len(triples)
+
+        self.assertEqual(1, self.kgu.update_missed_knowledge())
+
+        self.kgu.triple_producer.parse_all.assert_called_once_with(['John Doe ignored it.'], batch_size=1)
+        self.assertTrue(self.kgu.db_article_collection.find_one({'source': 'a'})['extracted'])
+        self.assertFalse(self.kgu.db_article_collection.find_one({'source': 'b'})['extracted'])
+        self.assertEqual(1, self.kgu.db_article_triples_collection.count_documents({'source': 'a'}))
+
+    def test_update_missed_knowledge_parses_one_by_one_if_batch_fails(self):
+        self.kgu.db_article_collection.insert_many([{'source': 'a', 'texts': 'A.', 'extracted': False},
+                                                    {'source': 'b', 'texts': 'B.', 'extracted': False}])
+        self.kgu.triple_producer.parse_all.side_effect = ValueError('bad batch')
+        self.kgu.triple_producer.produce_triples.side_effect = self.produce_triples
+        self.kg.check_triples_existence_bulk.side_effect = lambda triples: [False] * len(triples)
+
+        self.kgu.update_missed_knowledge()
+
+        self.assertEqual(['A.', 'B.'], [call[0][0] for call in
+                                        self.kgu.triple_producer.produce_triples.call_args_list])
+        self.assertTrue(all(call[1]['spacy_doc'] is None for call in
+                            self.kgu.triple_producer.produce_triples.call_args_list))
+        self.assertEqual(2, self.kgu.db_article_collection.count_documents({'extracted': True}))
+
+    def test_update_missed_knowledge_checks_one_by_one_if_batch_check_fails(self):
+        self.kgu.db_article_collection.insert_many([{'source': source, 'texts': source, 'extracted': False}
+                                                    for source in ['a', 'b', 'c']])
+        self.kgu.triple_producer.parse_all.return_value = iter(['spacy_doc_a', 'spacy_doc_b', 'spacy_doc_c'])
+
+        def produce_triples(document, extraction_scope=None, spacy_doc=None):
+            subject = '"Bad"' if document == 'b' else 'John_Doe'
+            return [(document, [Triple(subject, 'ignore', ['Social_distancing'])])]
+        self.kgu.triple_producer.produce_triples.side_effect = produce_triples
+
+        def check_triples_existence_bulk(triples):
+            if any(triple.subject == '"Bad"' for triple in triples):
+                raise Exception('400 Client Error: Bad Request')
+            return [True] * len(triples)
+        self.kg.check_triples_existence_bulk.side_effect = check_triples_existence_bulk
+
+        self.assertEqual(2, self.kgu.update_missed_knowledge())
+
+        self.assertEqual({'a': True, 'b': False, 'c': True},
+                         {article['source']: article['extracted'] for article in self.kgu.db_article_collection.find()})
+        self.assertEqual(4, self.kg.check_triples_existence_bulk.call_count)
+        self.assertTrue(self.kgu.db_article_triples_collection.find_one({'source': 'a'})['added'])
+        self.assertEqual(0, self.kgu.db_article_triples_collection.count_documents({'source': 'b'}))
+        # the runner waits once only the failing article is left
+        self.kgu.triple_producer.parse_all.return_value = iter(['spacy_doc_b'])
+        self.assertEqual(0, self.kgu.update_missed_knowledge())
+
+    @patch('knowledgegraphupdater.kgupdater.datetime')
+    def test_claim_article_leases_article(self, mock_datetime):
+        mock_datetime.utcnow.return_value = datetime(2021, 1, 1)
+        self.kgu.db_article_collection.insert_one({'source': 'a', 'texts': 'A.', 'extracted': False})
+
+        article = self.kgu.claim_article('worker-1', lease_duration=60)
+
+        self.assertEqual('a', article['source'])
+        self.assertIsNone(self.kgu.claim_article('worker-2', lease_duration=60))
+        stored = self.kgu.db_article_collection.find_one({'source': 'a'})
+        self.assertEqual('worker-1', stored['lease_owner'])
+        self.assertEqual(datetime(2021, 1, 1, 0, 1), stored['lease_expires'])
+
+    @patch('knowledgegraphupdater.kgupdater.datetime')
+    def test_expired_lease_reclaimed(self, mock_datetime):
+        mock_datetime.utcnow.return_value = datetime(2021, 1, 1)
+        self.kgu.db_article_collection.insert_one({'source': 'a', 'texts': 'A.', 'extracted': False})
+        self.kgu.claim_article('worker-1', lease_duration=60)
+
+        # the lease of worker-1 has expired, e.g. because it crashed
+        mock_datetime.utcnow.return_value = datetime(2021, 1, 1) + timedelta(seconds=61)
+        article = self.kgu.claim_article('worker-2', lease_duration=60)
+
+        self.assertEqual('a', article['source'])
+        self.assertFalse(self.kgu.renew_lease('a', 'worker-1', lease_duration=60))
+        self.assertTrue(self.kgu.renew_lease('a', 'worker-2', lease_duration=60))
+        self.assertEqual('worker-2', self.kgu.db_article_collection.find_one({'source': 'a'})['lease_owner'])
+
+    def test_process_claimed_articles_releases_lease_and_stops_heartbeat(self):
+        self.kgu.db_article_collection.insert_one({'source': 'a', 'texts': 'A.', 'extracted': False})
+
+        def slow_produce_triples(document, extraction_scope=None, spacy_doc=None):
+            time.sleep(0.25)
+            return self.produce_triples(document)
+        self.kgu.triple_producer.produce_triples.side_effect = slow_produce_triples
+        self.kg.check_triples_existence_bulk.side_effect = lambda triples: [False] * len(triples)
+        threads = threading.active_count()
+
+        with patch.object(self.kgu, 'renew_lease', wraps=self.kgu.renew_lease) as renew_lease:
+            self.assertEqual(1, self.kgu.process_claimed_articles('worker-1', lease_duration=0.3))
+            renewals = renew_lease.call_count
+            time.sleep(0.3)
+
+            self.assertGreater(renewals, 0)
+            self.assertEqual(renewals, renew_lease.call_count)
+        self.assertEqual(threads, threading.active_count())
+        stored = self.kgu.db_article_collection.find_one({'source': 'a'})
+        self.assertTrue(stored['extracted'])
+        self.assertNotIn('lease_owner', stored)
+        self.assertNotIn('lease_expires', stored)
+
+    def test_process_claimed_articles_lease_lost(self):
+        self.kgu.db_article_collection.insert_one({'source': 'a', 'texts': 'A.', 'extracted': False})
+
+        def produce_triples_losing_lease(document, extraction_scope=None, spacy_doc=None):
+            # another worker claims the article in the meantime
+            self.kgu.db_article_collection.update_one({'source': 'a'}, {'$set': {'lease_owner': 'worker-2'}})
+            time.sleep(0.25)
+            return self.produce_triples(document)
+        self.kgu.triple_producer.produce_triples.side_effect = produce_triples_losing_lease
+        self.kg.check_triples_existence_bulk.side_effect = lambda triples: [False] * len(triples)
+
+        with patch.object(self.kgu, 'renew_lease', wraps=self.kgu.renew_lease) as renew_lease:
+            self.kgu.process_claimed_articles('worker-1', lease_duration=0.3)
+
+            # the heartbeat stops once the lease is lost
+            self.assertEqual(1, renew_lease.call_count)
+        stored = self.kgu.db_article_collection.find_one({'source': 'a'})
+        self.assertFalse(stored['extracted'])
+        self.assertEqual('worker-2', stored['lease_owner'])
+        self.assertEqual(0, self.kgu.db_article_triples_collection.count_documents({'source': 'a'}))
+
+    def test_migrate_moves_nested_triples(self):
+        triples = [{'sentence': 'John Doe ignored social distancing.',
+                    'triples': [self.triple('John_Doe'), self.triple('John_Doe', 'meet', ['Jane_Doe'], added=True)]},
+                   {'sentence': 'He went out.', 'triples': [self.triple('John_Doe', 'go')]}]
+        self.kgu.db_article_collection.insert_many([{'source': 'a', 'texts': 'A.', 'triples': triples},
+                                                    {'source': 'b', 'texts': 'B.', 'triples': None}])
+        self.kgu.db_article_collection.create_index([('triples.triples.subject', 1), ('triples.triples.relation', 1)])
+        self.kgu.db_article_collection.create_index([('extracted', 1), ('date', -1)])
+
+        # the constructor only creates indexes
+        KnowledgeGraphUpdater()
+        self.assertIn('triples', self.kgu.db_article_collection.find_one({'source': 'a'}))
+
+        self.assertEqual(1, self.kgu.migrate())
+
+        self.assertEqual(3, self.kgu.db_article_triples_collection.count_documents({'source': 'a'}))
+        self.assertEqual(0, self.kgu.db_article_collection.count_documents({'triples': {'$exists': True}}))
+        self.assertTrue(self.kgu.db_article_collection.find_one({'source': 'a'})['extracted'])
+        self.assertFalse(self.kgu.db_article_collection.find_one({'source': 'b'})['extracted'])
+        self.assertEqual(triples, self.kgu.get_article_knowledge('a'))
+        for index in KnowledgeGraphUpdater.LEGACY_INDEXES:
+            self.assertNotIn(index, self.kgu.db_article_collection.index_information())
+        # migrating again changes nothing
+        self.assertEqual(0, self.kgu.migrate())
+        self.assertEqual(3, self.kgu.db_article_triples_collection.count_documents({}))
+
+    def test_article_triples_store(self):
+        self.kgu.db_article_collection.insert_one({'source': 'a', 'texts': 'A.', 'extracted': False})
+        self.kgu.triple_producer.parse_all.return_value = iter(['spacy_doc'])
+        self.kgu.triple_producer.produce_triples.side_effect = self.produce_triples
+        self.kg.check_triples_existence_bulk.side_effect = lambda triples: [False] * len(triples)
+        self.kgu.update_missed_knowledge()
+        self.kg.insert_triples_bulk.side_effect = lambda triples: [True] * len(triples)
+
+        inserted = self.kgu.insert_articles_knowledge([{'source': 'a', 'triples': [
+            {'sentence': 'A.', 'triples': [self.triple('John_Doe', 'ignore', ['Social_distancing'])]},
+            {'sentence': 'Not in the article.', 'triples': [self.triple('Jane_Doe')]}]}])
+
+        self.assertEqual([True, True], inserted)
+        self.assertEqual([{'sentence': 'A.', 'triples': [self.triple('John_Doe', added=True)]},
+                          {'sentence': '', 'triples': [self.triple('Jane_Doe', added=True)]}],
+                         self.kgu.get_article_knowledge('a'))
+        self.assertEqual([], self.kgu.get_article_pending_knowledge('a'))
+        self.assertIsNone(self.kgu.get_article_knowledge('unknown'))
+
+    def test_article_not_extracted_if_triples_not_saved(self):
+        self.kgu.db_article_collection.insert_many([{'source': 'a', 'texts': 'A.', 'extracted': False},
+                                                    {'source': 'b', 'texts': 'B.', 'extracted': False}])
+        self.kgu.triple_producer.parse_all.return_value = iter(['spacy_doc_a', 'spacy_doc_b'])
+        self.kgu.triple_producer.produce_triples.side_effect = self.produce_triples
+        self.kg.check_triples_existence_bulk.side_effect = lambda triples: [False] * len(triples)
+        bulk_write = self.kgu.db_article_triples_collection.bulk_write
+
+        def failing_bulk_write(operations, ordered=True):
+            if operations[0]._filter['source'] == 'a':
+                raise Exception('write failed')
+            return bulk_write(operations, ordered=ordered)
+        with patch.object(self.kgu.db_article_triples_collection, 'bulk_write', side_effect=failing_bulk_write):
+            self.kgu.update_missed_knowledge()
+
+        self.assertFalse(self.kgu.db_article_collection.find_one({'source': 'a'})['extracted'])
+        self.assertTrue(self.kgu.db_article_collection.find_one({'source': 'b'})['extracted'])
+        self.assertEqual(1, self.kgu.db_article_triples_collection.count_documents({'source': 'b'}))
+
+    def test_unresolved_coref_entities_indexed(self):
+        indexes = self.kgu.db_article_collection.index_information()
+
+        # the index covers the $match of get_all_unresolved_corefering_entities
+        self.assertEqual([('coref_entities.mentions.resolved', 1)], indexes['unresolved_coref_entities']['key'])
+        self.assertNotIn('coref_entities.main_1', indexes)
+
+    def test_article_pages_indexed(self):
+        indexes = self.kgu.db_article_collection.index_information()
+
+        # both the pending and the extracted articles are paged by _id
+        self.assertEqual([('extracted', 1), ('_id', 1)], indexes['articles_by_extracted']['key'])
+        self.assertNotIn('partialFilterExpression', indexes['articles_by_extracted'])
+        self.assertNotIn('extracted_1_date_-1', indexes)
+
+    def test_pending_page_skips_articles_without_pending_triples(self):
+        for source in ['a', 'b', 'c', 'd']:
+            self.kgu.db_article_collection.insert_one({'source': source, 'texts': source, 'extracted': True})
+        self.kgu.db_article_triples_collection.insert_many([
+            dict(self.triple('John_Doe', added=True), source='a', sentence_index=0, sentence='a', triple_key='1'),
+            dict(self.triple('Jane_Doe'), source='c', sentence_index=0, sentence='c', triple_key='2'),
+            dict(self.triple('John_Doe', 'meet', ['Jane_Doe']), source='c', sentence_index=1, sentence='c.',
+                 triple_key='3'),
+            dict(self.triple('Jane_Doe'), source='d', sentence_index=0, sentence='d', triple_key='2')])
+
+        with patch.object(self.kgu.db_article_triples_collection, 'find_one',
+                          wraps=self.kgu.db_article_triples_collection.find_one) as find_one:
+            pending, next_cursor = self.kgu.get_all_pending_knowledge(limit=1)
+
+            # the articles without pending triples are not read, and one more article is found for the next page
+            self.assertEqual(2, find_one.call_count)
+        self.assertEqual([{'source': 'c', 'triples': [
+            {'sentence': 'c', 'triples': [self.triple('Jane_Doe')]},
+            {'sentence': 'c.', 'triples': [self.triple('John_Doe', 'meet', ['Jane_Doe'])]}]}], pending)
+        self.assertEqual('c', next_cursor)
+        self.assertEqual(([{'source': 'd', 'triples': [{'sentence': 'd', 'triples': [self.triple('Jane_Doe')]}]}],
+                          None), self.kgu.get_all_pending_knowledge(next_cursor, limit=1))
+        self.assertEqual(([], None), self.kgu.get_all_pending_knowledge('d'))
+        self.assertEqual(['c', 'd'], [article['source'] for article in self.kgu.iterate_all_pending_knowledge()])
+
+if __name__ == '__main__':
+    unittest.main()
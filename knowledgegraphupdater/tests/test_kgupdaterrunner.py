@@ -0,0 +1,46 @@
+import unittest
+from mock import MagicMock, patch
+
+from .. import kgupdaterrunner
+
+
+class StopSupervisor(Exception):
+    pass
+
+
+class TestKgUpdaterRunner(unittest.TestCase):
+
+    @patch('knowledgegraphupdater.kgupdaterrunner.logging.config.fileConfig')
+    @patch('knowledgegraphupdater.kgupdaterrunner.time.sleep')
+    @patch('knowledgegraphupdater.kgupdaterrunner.multiprocessing.Process')
+    def test_worker_pool_restarts_dead_workers(self, mock_process, mock_sleep, mock_file_config):
+        processes = []
+
+        def create_process(target, args, daemon):
+            process = MagicMock()
+            process.args = args
+            process.is_alive.return_value = True
+            processes.append(process)
+            return process
+        mock_process.side_effect = create_process
+
+        def supervisor_sleep(seconds):
+            if mock_sleep.call_count == 1:
+                # the first worker dies after the first check
+                processes[0].is_alive.return_value = False
+                processes[0].exitcode = 1
+            elif mock_sleep.call_count == 3:
+                raise StopSupervisor()
+        mock_sleep.side_effect = supervisor_sleep
+
+        with self.assertRaises(StopSupervisor):
+            kgupdaterrunner.run_worker_pool(2)
+
+        self.assertEqual([(0,), (1,), (0,)], [process.args for process in processes])
+        for process in processes:
+            process.start.assert_called_once()
+        mock_sleep.assert_called_with(kgupdaterrunner.SUPERVISOR_INTERVAL)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -7,6 +7,8 @@ import {handleFactCheckResponse} from "./FactCheckerView";
 
 function ArticleTable({selectedArticle, setSelectedArticle, isUpdating}) {
     const [articles, setArticles] = useState();
+    const [nextCursor, setNextCursor] = useState(null);
+    const [loadingArticles, setLoadingArticles] = useState(false);
 
     const articleColumns = [
         {
@@ -60,11 +62,20 @@ function ArticleTable({selectedArticle, setSelectedArticle, isUpdating}) {
         }
     ];
 
-    const getArticles = () => {
-        axios.get('/kgu/articles/extracted/')
+    const getArticles = (cursor = null, fetched = []) => {
+        setLoadingArticles(true);
+        axios.get('/kgu/articles/extracted/', {params: {cursor: cursor}})
             .then((res) => {
-                setArticles(res.data.articles);
-        })
+                setArticles(fetched.concat(res.data.articles));
+                setNextCursor(res.data.next_cursor);
+            })
+            .finally(() => {
+                setLoadingArticles(false);
+            })
+    }
+
+    const onLoadMoreClick = () => {
+        getArticles(nextCursor, articles);
     }
 
     const onSelectChange = (selectedRowKeys) => {
@@ -82,18 +93,26 @@ function ArticleTable({selectedArticle, setSelectedArticle, isUpdating}) {
     }, [isUpdating]);
 
     return(
-        <Table
-            dataSource={articles}
-            columns={articleColumns}
-            rowKey='source'
-            rowSelection={rowSelection}
-            onRow={(record, rowIndex) => {
-                return {
-                    onClick: e => setSelectedArticle([record.source])
-                };
-            }}
-            pagination={{pageSize: 5}}
-        />
+        <>
+            <Table
+                dataSource={articles}
+                columns={articleColumns}
+                rowKey='source'
+                rowSelection={rowSelection}
+                onRow={(record, rowIndex) => {
+                    return {
+                        onClick: e => setSelectedArticle([record.source])
+                    };
+                }}
+                pagination={{pageSize: 5}}
+                loading={loadingArticles}
+            />
+            {nextCursor &&
+                <Button onClick={onLoadMoreClick} loading={loadingArticles}>
+                    Load more articles
+                </Button>
+            }
+        </>
     )
 }
 